@@ -1,12 +1,25 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, g, Response, send_file, redirect
 from flask_cors import CORS
+import gzip
 import hashlib
 import json
 import time
 from datetime import datetime
 from config import Config
-from auth import auth_bp
+from auth import auth_bp, UserStore
 from news_service import NewsService
+from metrics import STAGE_SECONDS, REQUEST_SECONDS, IN_FLIGHT, JOBS, CONTENT_TYPE_LATEST, render_latest
+from tracing import tracer, new_request_id
+from cache import build_cache
+from models import Article, parse_fields
+from feeds import FeedTracker
+import fast_json
+from preferences import PreferencesStore, DEFAULT_PREFERENCES, normalize_preferences
+from personalization import FeedRanker
+from image_proxy import ImageProxy, ImageProxyError
+from shares import ShareStore
+from share_previews import PreviewCache, render_preview, is_bot, SHARE_ID
+from jobs import JobQueue, QueueFull, DONE, PARTIAL, FAILED, spawn_worker_pool
 import os
 
 app = Flask(__name__)
@@ -22,13 +35,41 @@ CORS(
         r"/*": {
             "origins": ALLOWED_ORIGINS,
             "supports_credentials": True,
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "X-Request-ID"],
+            "expose_headers": ["X-Request-ID"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
         }
     },
     supports_credentials=True
 )
 
+tracer.configure(
+    sample_rate=app.config['TRACE_SAMPLE_RATE'],
+    slow_threshold_ms=app.config['TRACE_SLOW_THRESHOLD_MS'],
+    buffer_size=app.config['TRACE_BUFFER_SIZE'],
+    max_spans=app.config['TRACE_MAX_SPANS'],
+    export_path=app.config['TRACE_EXPORT_PATH']
+)
+
+# Track in-flight requests and end-to-end latency for /metrics, and open a trace
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    IN_FLIGHT.inc()
+    g.request_id = request.headers.get('X-Request-ID', '')[:64] or new_request_id()
+    trace = tracer.start_trace(g.request_id, f"{request.method} {request.endpoint or 'unmatched'}")
+    trace.attrs['path'] = request.path
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    start = g.pop('request_start', None)
+    if start is None:
+        return
+    IN_FLIGHT.dec()
+    # Use the route endpoint rather than the raw path to keep label cardinality bounded
+    REQUEST_SECONDS.observe(request.endpoint or 'unmatched', request.method, value=time.perf_counter() - start)
+    tracer.finish_trace(g.pop('response_status', None), exc)
+
 # Add CORS headers to all responses
 @app.after_request
 def after_request(response):
@@ -49,22 +90,63 @@ def after_request(response):
     if request.method == 'OPTIONS':
         response.status_code = 200
     
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+        g.response_status = response.status_code
+    
     return response
 
 # No OAuth initialization; using email/password with server-side session
 
+# Shared summary/response cache
+cache = build_cache(app.config)
+
+# Feed snapshots for /api/news?since=<version> delta sync
+feed_tracker = FeedTracker(cache, snapshot_ttl=app.config['FEED_SNAPSHOT_TTL'])
+
+# Persisted user preferences and per-user ranking of the cached category pools
+preferences_store = PreferencesStore(app.config['PREFERENCES_DB_PATH'])
+feed_ranker = FeedRanker(cache, ttl=app.config['NEWS_CACHE_TTL'])
+
+# Article image proxy with an on-disk thumbnail cache
+image_proxy = ImageProxy(
+    app.secret_key,
+    app.config['IMAGE_CACHE_DIR'],
+    app.config['IMAGE_CACHE_MAX_BYTES'],
+    public_base_url=app.config['PUBLIC_API_URL']
+)
+
 # Initialize News Service
 news_service = NewsService(
     app.config['NEWS_API_KEY'],
     app.config['GEMINI_API_KEY'],
-    app.config.get('GOOGLE_TRANSLATE_KEY')
+    app.config.get('GOOGLE_TRANSLATE_KEY'),
+    news_api_base_url=app.config['NEWS_API_BASE_URL'],
+    summarizer_backends=app.config['SUMMARIZER_BACKENDS'],
+    summary_budget_ms=app.config['SUMMARY_BUDGET_MS'],
+    quota_cooldown_s=app.config['GEMINI_QUOTA_COOLDOWN_S'],
+    cache=cache,
+    summary_cache_ttl=app.config['SUMMARY_CACHE_TTL'],
+    max_workers=app.config['FANOUT_MAX_WORKERS'],
+    image_url_rewriter=image_proxy.proxy_url
+)
+
+# Background summarize/translate jobs, run by worker.py processes in async mode
+async_enrichment = app.config['ENRICHMENT_MODE'] == 'async'
+job_queue = JobQueue(
+    app.config['JOB_QUEUE_PATH'],
+    max_pending=app.config['JOB_QUEUE_MAX_PENDING'],
+    max_attempts=app.config['JOB_MAX_ATTEMPTS'],
+    lease_s=app.config['JOB_LEASE_S']
 )
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
 
-# In-memory storage for shared articles (replace with DB later)
-shared_articles = {}
+# Accounts and share links live in SQLite so every worker process sees them
+app.extensions['user_store'] = UserStore(app.config['USERS_DB_PATH'])
+share_store = ShareStore(app.config['SHARES_DB_PATH'])
+preview_cache = PreviewCache(app.config['SHARE_PREVIEW_DIR'], app.config['SHARE_PREVIEW_MEMORY_ENTRIES'])
 
 # ADD THIS: Root route for Render health checks
 @app.route('/')
@@ -75,7 +157,7 @@ def index():
         'message': 'News Dashboard API is running',
         'version': '1.0.0',
         'health_endpoint': '/api/health',
-        'documentation': 'Available endpoints: /api/news, /api/health, /auth/signup, /auth/login, /auth/logout, /auth/user'
+        'documentation': 'Available endpoints: /api/news, /api/news/batch, /api/health, /metrics, /auth/signup, /auth/login, /auth/logout, /auth/user'
     })
 
 @app.route('/api/health')
@@ -87,6 +169,117 @@ def health_check():
         'service': 'News Dashboard API'
     })
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(render_latest(), content_type=CONTENT_TYPE_LATEST)
+
+def _admin_authorized():
+    token = app.config.get('ADMIN_TOKEN')
+    return bool(token) and request.headers.get('X-Admin-Token') == token
+
+@app.route('/api/admin/traces')
+def list_traces():
+    """Recently kept request traces, newest first"""
+    if not _admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    limit = request.args.get('limit', 50, type=int)
+    min_duration = request.args.get('minDurationMs', 0, type=float)
+    return jsonify({'traces': tracer.recent(limit=limit, min_duration_ms=min_duration)})
+
+@app.route('/api/admin/jobs')
+def job_stats():
+    """Background job counts by status"""
+    if not _admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'mode': app.config['ENRICHMENT_MODE'], 'jobs': job_queue.stats()})
+
+@app.route('/api/admin/traces/<request_id>')
+def get_trace(request_id):
+    """Single kept trace by request ID"""
+    if not _admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    trace = tracer.get(request_id)
+    if not trace:
+        return jsonify({'error': 'Trace not found'}), 404
+    return jsonify(trace)
+
+def _news_cache_key(category, language, user_language):
+    return f"{category}:{language}:{user_language}"
+
+def _cache_news(cache_key, total_results, articles, pending=None):
+    """Cache a processed page and record its feed snapshot; returns the cache entry.
+    
+    `pending` maps article IDs to the background jobs still enriching them.
+    """
+    version = feed_tracker.record(cache_key, [article.id for article in articles])
+    # Identifies this build of the page; pre-encoded bodies are keyed on it, since
+    # summaries can change between builds while the feed version (article IDs) stays the same
+    built_at = f"{time.time():.6f}"
+    entry = {
+        'totalResults': total_results,
+        'articles': [article.to_row() for article in articles],
+        'version': version,
+        'builtAt': built_at,
+        'pending': pending or {}
+    }
+    cache.set('news', cache_key, entry, ttl=app.config['NEWS_CACHE_TTL'])
+    return entry
+
+def _enrichment_ref(article_id, user_language):
+    return f"{article_id}\x00{user_language}"
+
+def _queue_enrichment(articles, user_language, language):
+    """Queue summarize/translate jobs for fresh articles; returns {article ID: job key} still pending"""
+    pending = {}
+    for article in articles:
+        key = news_service.enrichment_key(article, user_language, language)
+        try:
+            payload = news_service.enrichment_payload(article, user_language, language)
+            job = job_queue.enqueue(key, 'enrich', payload, ref=_enrichment_ref(article.id, user_language))
+        except QueueFull:
+            # Backpressure: the workers are far behind, so settle for a local summary now,
+            # still translated for the reader
+            JOBS.inc('enrich', 'rejected')
+            news_service.enrich_article(article, summarize=True, translate_to=user_language,
+                                        source_language=language, local_only=True)
+            article.summaryStatus = 'ready'
+            continue
+        JOBS.inc('enrich', 'enqueued' if job['created'] else 'deduplicated')
+        if job['status'] == DONE:
+            news_service.apply_enrichment(article, job['result'])
+        else:
+            article.summaryStatus = 'pending'
+            pending[article.id] = key
+    return pending
+
+def _refresh_pending(cache_key, cached):
+    """Fold finished background jobs into a cached page; returns the (possibly rebuilt) entry"""
+    pending = cached.get('pending')
+    if not pending:
+        return cached
+    finished = {key: job for key, job in job_queue.results(pending.values()).items()
+                if job['status'] in (DONE, PARTIAL, FAILED)}
+    if not finished:
+        return cached
+    articles = [Article.from_row(row) for row in cached['articles']]
+    for article in articles:
+        job = finished.get(pending.get(article.id))
+        if job is None:
+            continue
+        if job['status'] in (DONE, PARTIAL):
+            news_service.apply_enrichment(article, job['result'])
+        else:
+            article.summaryStatus = 'failed'
+    still_pending = {article_id: key for article_id, key in pending.items() if key not in finished}
+    return _cache_news(cache_key, cached['totalResults'], articles, still_pending)
+
+def _json_response(body):
+    return app.response_class(body, mimetype='application/json')
+
+def _requested_fields():
+    return parse_fields(request.args.get('fields'), request.args.get('lite', '').lower() in ('1', 'true'))
+
 @app.route('/api/news')
 def get_news():
     """Fetch news articles"""
@@ -95,29 +288,209 @@ def get_news():
         language = request.args.get('language', 'en')
         user_language = request.args.get('userLanguage', 'en')
         
-        # Fetch raw articles
-        news_data = news_service.fetch_news(category=category, language=language, page_size=20)
+        try:
+            fields = _requested_fields()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        cache_key = _news_cache_key(category, language, user_language)
+        found, cached = cache.get('news', cache_key)
+        articles = None
+        if found:
+            if async_enrichment:
+                cached = _refresh_pending(cache_key, cached)
+            total_results = cached['totalResults']
+            version = cached['version']
+            built_at = cached['builtAt']
+        else:
+            # Fetch raw articles
+            news_data = news_service.fetch_news(category=category, language=language, page_size=20)
+            
+            if not news_data or news_data.get('status') == 'error':
+                return jsonify({'articles': [], 'error': news_data.get('message', 'No articles found')})
+            
+            # Process articles (summarize, translate if needed); in async mode that work is
+            # queued and the articles go out now with summaryStatus 'pending'
+            processed_data = news_service.process_news_data(
+                news_data, 
+                summarize=not async_enrichment, 
+                translate_to=None if async_enrichment else user_language,
+                source_language=language
+            )
+            articles = processed_data.get('articles', [])
+            total_results = processed_data.get('totalResults', 0)
+            pending = _queue_enrichment(articles, user_language, language) if async_enrichment else None
+            cached = _cache_news(cache_key, total_results, articles, pending)
+            version = cached['version']
+            built_at = cached['builtAt']
         
-        if not news_data or news_data.get('status') == 'error':
-            return jsonify({'articles': [], 'error': news_data.get('message', 'No articles found')})
+        since = request.args.get('since')
+        with STAGE_SECONDS.time('serialize'):
+            payload = {
+                'category': category,
+                'timestamp': datetime.now().isoformat(),
+                'totalResults': total_results,
+                'version': version
+            }
+            if since:
+                if articles is None:
+                    articles = [Article.from_row(row) for row in cached['articles']]
+                ids = [article.id for article in articles]
+                changes = feed_tracker.diff(cache_key, since, ids)
+                if changes is not None:
+                    # Delta: only bodies for articles the client has not seen
+                    added, removed = changes
+                    added_ids = set(added)
+                    payload.update({
+                        'delta': True,
+                        'since': since,
+                        'added': added,
+                        'removed': removed,
+                        'ids': ids,
+                        'articles': [article.to_dict(fields) for article in articles if article.id in added_ids]
+                    })
+                    return _json_response(fast_json.dumps(payload))
+                # Unknown or expired version; the client must replace its feed
+                payload['delta'] = False
+            
+            # The encoded article list is built once per cached page and projection
+            body_key = f"{cache_key}:{built_at}:{'*' if fields is None else ','.join(fields)}"
+            found, articles_json = cache.get('news_body', body_key)
+            if not found:
+                if articles is None:
+                    articles = [Article.from_row(row) for row in cached['articles']]
+                articles_json = fast_json.dumps([article.to_dict(fields) for article in articles])
+                cache.set('news_body', body_key, articles_json, ttl=app.config['NEWS_CACHE_TTL'])
+            return _json_response(fast_json.splice({'articles': articles_json}, payload))
         
-        # Process articles (summarize, translate if needed)
-        processed_data = news_service.process_news_data(
-            news_data, 
-            summarize=True, 
-            translate_to=user_language if user_language != 'en' else None
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _load_pools(categories, language, user_language):
+    """Processed pages for several categories from the news cache, fanning out only the misses.
+    
+    Returns {category: {'totalResults', 'articles', 'builtAt'}} or {category: {'error': message}}.
+    """
+    results = {}
+    misses = []
+    for category in categories:
+        cache_key = _news_cache_key(category, language, user_language)
+        found, cached = cache.get('news', cache_key)
+        if found:
+            if async_enrichment:
+                cached = _refresh_pending(cache_key, cached)
+            results[category] = {
+                'totalResults': cached['totalResults'],
+                'articles': [Article.from_row(row) for row in cached['articles']],
+                'builtAt': cached['builtAt']
+            }
+        else:
+            misses.append(category)
+    
+    if misses:
+        fetched = news_service.fetch_and_process_many(
+            misses,
+            language=language,
+            summarize=not async_enrichment,
+            translate_to=None if async_enrichment else user_language
         )
+        for category, result in fetched.items():
+            if 'error' not in result:
+                pending = _queue_enrichment(result['articles'], user_language, language) if async_enrichment else None
+                entry = _cache_news(_news_cache_key(category, language, user_language),
+                                    result['totalResults'], result['articles'], pending)
+                result['builtAt'] = entry['builtAt']
+            results[category] = result
+    return results
+
+@app.route('/api/news/enrichments')
+def get_enrichments():
+    """Summaries and translations for articles sent with summaryStatus 'pending'"""
+    ids = list(dict.fromkeys(request.args.getlist('id')))
+    user_language = request.args.get('userLanguage', 'en')
+    if not ids:
+        return jsonify({'error': 'No article IDs provided'}), 400
+    if len(ids) > app.config['ENRICHMENT_MAX_IDS']:
+        return jsonify({'error': f"At most {app.config['ENRICHMENT_MAX_IDS']} IDs per request"}), 400
+    
+    jobs = job_queue.results_by_ref(_enrichment_ref(article_id, user_language) for article_id in ids)
+    enrichments = {}
+    for article_id in ids:
+        job = jobs.get(_enrichment_ref(article_id, user_language))
+        if job is None:
+            enrichments[article_id] = {'summaryStatus': 'unknown'}
+        elif job['status'] in (DONE, PARTIAL):
+            enrichments[article_id] = dict(
+                {k: v for k, v in job['result'].items() if v is not None}, summaryStatus='ready'
+            )
+        elif job['status'] == FAILED:
+            enrichments[article_id] = {'summaryStatus': 'failed'}
+        else:
+            enrichments[article_id] = {'summaryStatus': 'pending'}
+    return jsonify({'enrichments': enrichments})
+
+@app.route('/api/news/batch')
+def get_news_batch():
+    """Fetch several categories in one request, summarizing shared articles once"""
+    try:
+        categories = list(dict.fromkeys(
+            c.strip() for c in request.args.get('categories', '').split(',') if c.strip()
+        ))
+        language = request.args.get('language', 'en')
+        user_language = request.args.get('userLanguage', 'en')
         
-        return jsonify({
-            'articles': processed_data.get('articles', []),
-            'category': category,
-            'timestamp': datetime.now().isoformat(),
-            'totalResults': processed_data.get('totalResults', 0)
-        })
+        if not categories:
+            return jsonify({'error': 'No categories provided'}), 400
+        if len(categories) > app.config['BATCH_MAX_CATEGORIES']:
+            return jsonify({'error': f"At most {app.config['BATCH_MAX_CATEGORIES']} categories per batch"}), 400
+        try:
+            fields = _requested_fields()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results = _load_pools(categories, language, user_language)
+        
+        with STAGE_SECONDS.time('serialize'):
+            # Each article is sent once; categories list their article IDs in feed order
+            articles = {}
+            by_category = {}
+            for category in categories:
+                result = results[category]
+                if 'error' in result:
+                    by_category[category] = {'ids': [], 'totalResults': 0, 'error': result['error']}
+                    continue
+                ids = []
+                for article in result['articles']:
+                    if article.id not in articles:
+                        articles[article.id] = article.to_dict(fields)
+                    ids.append(article.id)
+                by_category[category] = {'ids': ids, 'totalResults': result['totalResults']}
+            
+            return _json_response(fast_json.dumps({
+                'articles': articles,
+                'categories': by_category,
+                'categoryOrder': categories,
+                'timestamp': datetime.now().isoformat()
+            }))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/image')
+def get_image():
+    """Resized, cached copy of an article image"""
+    url = request.args.get('url', '')
+    if not url or not image_proxy.verify(url, request.args.get('sig', '')):
+        return jsonify({'error': 'Invalid image signature'}), 403
+    try:
+        path, mimetype, etag = image_proxy.get(url, request.args.get('w', type=int))
+    except ImageProxyError as e:
+        return jsonify({'error': str(e)}), e.status
+    response = send_file(path, mimetype=mimetype, etag=etag, max_age=7 * 24 * 3600)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/api/article/<article_id>')
 def get_article(article_id):
     """Get full article details"""
@@ -146,17 +519,15 @@ def share_article():
             f"{article_data.get('url', '')}{time.time()}".encode()
         ).hexdigest()[:12]
         
-        # Store article data (in production, use database)
-        shared_articles[share_id] = {
-            'article': article_data,
-            'created_at': datetime.now().isoformat(),
-            'views': 0
-        }
+        share_store.add(share_id, article_data, datetime.now().isoformat())
         
         # Use environment variable for base URL or default to request host
         base_url = request.host_url.rstrip('/')
         share_url = f"{base_url}/shared/{share_id}"
         
+        # Render the link preview now so the first bot to unfurl it is served from cache
+        preview_cache.put(share_id, render_preview(article_data, share_url, _frontend_share_url(share_id)))
+        
         return jsonify({
             'shareId': share_id,
             'shareUrl': share_url
@@ -165,17 +536,60 @@ def share_article():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _frontend_share_url(share_id):
+    return f"{app.config['FRONTEND_URL'].rstrip('/')}/shared/{share_id}"
+
+@app.route('/shared/<share_id>')
+def shared_preview(share_id):
+    """Open Graph preview for link-preview bots; people are sent on to the frontend"""
+    try:
+        if not is_bot(request.headers.get('User-Agent')):
+            return redirect(_frontend_share_url(share_id))
+        if not SHARE_ID.match(share_id):
+            return jsonify({'error': 'Article not found'}), 404
+        
+        body = preview_cache.get(share_id)
+        if body is None:
+            # Bot fetches are not counted as views
+            shared = share_store.get(share_id)
+            if shared is None:
+                return jsonify({'error': 'Article not found'}), 404
+            page = render_preview(shared['article'], request.base_url, _frontend_share_url(share_id))
+            body = preview_cache.put(share_id, page)
+        
+        headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'public, max-age=3600'}
+        if 'gzip' in request.accept_encodings:
+            headers['Content-Encoding'] = 'gzip'
+        else:
+            body = gzip.decompress(body)
+        return Response(body, mimetype='text/html', headers=headers)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/shared/<share_id>')
 def get_shared_article(share_id):
     """Get shared article by ID"""
     try:
-        if share_id not in shared_articles:
+        shared = share_store.get(share_id, count_view=True)
+        if shared is None:
             return jsonify({'error': 'Article not found'}), 404
         
-        # Increment view count
-        shared_articles[share_id]['views'] += 1
+        return jsonify(shared)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/preferences', methods=['GET'])
+def get_preferences():
+    """Get the current user's preferences"""
+    try:
+        user = session.get('user')
+        if not user:
+            return jsonify({'error': 'Not authenticated'}), 401
         
-        return jsonify(shared_articles[share_id])
+        preferences = preferences_store.get(user['id']) or dict(DEFAULT_PREFERENCES)
+        return jsonify({'preferences': preferences})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -188,9 +602,13 @@ def save_preferences():
         if not user:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        # In production, save to database
-        # For now, just return success
-        preferences = request.json
+        try:
+            preferences = normalize_preferences(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Saving bumps updatedAt, which moves the user's feed onto fresh cache keys
+        preferences = preferences_store.save(user['id'], preferences)
         return jsonify({
             'message': 'Preferences saved successfully',
             'preferences': preferences
@@ -199,6 +617,35 @@ def save_preferences():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/feed')
+def get_feed():
+    """Personalized feed ranked from the shared category pools"""
+    try:
+        user = session.get('user')
+        if not user:
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        try:
+            fields = _requested_fields()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        limit = max(1, min(request.args.get('limit', 30, type=int), 100))
+        
+        preferences = preferences_store.get(user['id']) or dict(DEFAULT_PREFERENCES, updatedAt=0)
+        categories = preferences['preferredCategories'][:app.config['BATCH_MAX_CATEGORIES']]
+        pools = _load_pools(categories, 'en', preferences['language'])
+        articles = feed_ranker.rank(user['id'], preferences, pools, limit)
+        
+        with STAGE_SECONDS.time('serialize'):
+            return _json_response(fast_json.dumps({
+                'articles': [article.to_dict(fields) for article in articles],
+                'categories': categories,
+                'timestamp': datetime.now().isoformat()
+            }))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 
 
 # ADD THIS: Better error handling for 404s
@@ -209,14 +656,29 @@ def not_found(error):
         'available_endpoints': [
             '/ (GET) - API info',
             '/api/health (GET) - Health check',
-            '/api/news (GET) - Get news articles',
+            '/metrics (GET) - Prometheus metrics',
+            '/api/news (GET) - Get news articles (?fields=a,b or ?lite=1 to trim the payload, ?since=<version> for changes only)',
+            '/api/news/batch (GET) - Get several categories at once (?categories=a,b,c)',
+            '/api/news/enrichments (GET) - Summaries/translations for pending articles (?id=...&id=...)',
+            '/api/feed (GET) - Personalized feed (requires login)',
+            '/api/preferences (GET, POST) - Read or save preferences (requires login)',
+            '/api/image (GET) - Proxied article thumbnail (signed URLs from /api/news)',
             '/api/share (POST) - Share article',
+            '/shared/<share_id> (GET) - Link preview for bots, redirect for people',
             '/auth/signup (POST) - Sign up with email/password',
             '/auth/login (POST) - Log in with email/password'
         ]
     }), 404
 
 if __name__ == '__main__':
-    # Production settings
+    # Development server; production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    job_workers = None
+    if async_enrichment and app.config['JOB_WORKERS'] > 0:
+        job_workers = spawn_worker_pool(app.config['JOB_WORKERS'])
+    try:
+        app.run(host='0.0.0.0', port=port)
+    finally:
+        if job_workers:
+            job_workers.terminate()
+            job_workers.wait(timeout=30)
\ No newline at end of file
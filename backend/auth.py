@@ -1,10 +1,42 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from sqlite_db import ThreadLocalSQLite
+
 auth_bp = Blueprint('auth', __name__)
 
-# Simple in-memory user store; replace with database in production
-_users_by_email = {}
+
+class UserStore:
+    """SQLite-backed email/password accounts, shared by all worker processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = ThreadLocalSQLite(path, [
+            'CREATE TABLE IF NOT EXISTS users ('
+            'email TEXT PRIMARY KEY, name TEXT NOT NULL, password_hash TEXT NOT NULL)'
+        ])
+
+    def get(self, email):
+        row = self._db.conn().execute(
+            'SELECT email, name, password_hash FROM users WHERE email = ?', (email,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'email': row[0], 'name': row[1], 'password_hash': row[2]}
+
+    def add(self, email, name, password_hash):
+        """False if the email is already registered"""
+        conn = self._db.conn()
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO users (email, name, password_hash) VALUES (?, ?, ?)',
+            (email, name, password_hash)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+
+
+def _users():
+    return current_app.extensions['user_store']
 
 
 @auth_bp.route('/signup', methods=['GET', 'POST'])
@@ -17,16 +49,9 @@ def signup():
     if not email or not password:
         return jsonify({'error': 'Email and password are required'}), 400
 
-    if email in _users_by_email:
+    if not _users().add(email, name, generate_password_hash(password)):
         return jsonify({'error': 'User already exists'}), 409
 
-    _users_by_email[email] = {
-        'id': email,
-        'email': email,
-        'name': name,
-        'password_hash': generate_password_hash(password)
-    }
-
     session['user'] = {'id': email, 'email': email, 'name': name}
     return jsonify({'message': 'Signup successful', 'user': session['user']}), 201
 
@@ -37,7 +62,7 @@ def login():
     email = (data.get('email') or '').strip().lower()
     password = data.get('password') or ''
 
-    user = _users_by_email.get(email)
+    user = _users().get(email)
     if not user or not check_password_hash(user['password_hash'], password):
         return jsonify({'error': 'Invalid email or password'}), 401
 
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark and load test for the News Dashboard Backend.
+
+By default the app is loaded in-process with NewsAPI, Gemini and Google
+Translate replaced by the stand-ins in fake_upstreams.py, so no API keys or
+network access are needed. Use --target to drive an already running server
+instead (start it with NEWS_API_BASE_URL pointing at fake_upstreams.py), or
+--launcher to start one as a subprocess: `dev` is the single-process
+`python app.py`, `gunicorn` the production server from gunicorn.conf.py.
+Launched servers cannot take the fake Gemini model, so they summarize with
+the local extractive backend.
+
+Examples:
+    python benchmark.py --concurrency 8 --requests 200
+    python benchmark.py --scenarios news --gemini-latency-ms 50 --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json --tolerance 0.15   # regression gate
+    python benchmark.py --scenarios news --no-cache   # every request fetches, summarizes, translates
+    python benchmark.py --serialization   # jsonify vs fast encoder vs pre-serialized body
+    python benchmark.py --launcher dev --scenarios news,shared --concurrency 16
+    WEB_CONCURRENCY=4 python benchmark.py --launcher gunicorn --scenarios news,shared --concurrency 16
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from fake_upstreams import (
+    CATEGORIES, FakeGeminiModel, FakeNewsAPIServer, FakeTranslateClient, UpstreamBehavior, make_articles
+)
+
+SCENARIOS = ['news', 'share', 'shared', 'login']
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LAUNCHERS = {
+    'dev': [sys.executable, 'app.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+}
+
+BENCH_USER = {'email': 'bench@example.com', 'password': 'bench-password', 'name': 'Bench'}
+
+
+class InProcessClient:
+    """Flask test client; one per worker thread so sessions stay separate"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method: str, path: str, payload=None):
+        response = self._client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPClient:
+    def __init__(self, base_url: str):
+        import requests
+        self._session = requests.Session()
+        self._base_url = base_url.rstrip('/')
+
+    def request(self, method: str, path: str, payload=None):
+        response = self._session.request(method, self._base_url + path, json=payload, timeout=120)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_scenario(name: str, setup_client, user_language: str) -> Callable:
+    """Return a callable(client, i) -> status code for one scenario"""
+    if name == 'news':
+        def run(client, i):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            return client.request('GET', f"/api/news?category={category}&userLanguage={user_language}")[0]
+        return run
+
+    if name == 'share':
+        def run(client, i):
+            article = {'url': f"https://example.com/bench/{i}", 'title': f"Bench article {i}"}
+            return client.request('POST', '/api/share', {'article': article})[0]
+        return run
+
+    if name == 'shared':
+        status, body = setup_client.request('POST', '/api/share', {
+            'article': {'url': 'https://example.com/bench/shared', 'title': 'Shared bench article'}
+        })
+        if status != 200 or not body:
+            raise RuntimeError(f"Could not create share for benchmark (status {status})")
+        share_id = body['shareId']
+
+        def run(client, i):
+            return client.request('GET', f"/api/shared/{share_id}")[0]
+        return run
+
+    if name == 'login':
+        status, _ = setup_client.request('POST', '/auth/signup', BENCH_USER)
+        if status not in (201, 409):
+            raise RuntimeError(f"Could not create benchmark user (status {status})")
+        credentials = {'email': BENCH_USER['email'], 'password': BENCH_USER['password']}
+
+        def run(client, i):
+            return client.request('POST', '/auth/login', credentials)[0]
+        return run
+
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def run_scenario(run: Callable, make_client: Callable, requests_count: int, concurrency: int, warmup: int) -> Dict:
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = make_client()
+        return local.client
+
+    for i in range(warmup):
+        run(client(), i)
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            status = run(client(), i)
+        except Exception:
+            status = None
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for r in results if r[1] is None or r[1] >= 400)
+    return {
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput': round(requests_count / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0
+    }
+
+
+def bench_serialization(flask_app, iterations: int) -> Dict:
+    """Per-request cost of encoding a 20-article /api/news page, in microseconds"""
+    from datetime import datetime
+    from flask import jsonify
+    import fast_json
+    from models import Article
+
+    articles = [Article.from_newsapi(raw) for raw in make_articles('technology', 20)]
+    for article in articles:
+        article.summary = article.description
+
+    def envelope():
+        return {'category': 'technology', 'timestamp': datetime.now().isoformat(), 'totalResults': 20, 'version': 'x'}
+
+    def jsonify_path():
+        payload = envelope()
+        payload['articles'] = [a.to_dict() for a in articles]
+        return jsonify(payload).get_data()
+
+    def fast_path():
+        payload = envelope()
+        payload['articles'] = [a.to_dict() for a in articles]
+        return fast_json.dumps(payload)
+
+    cached_articles = fast_json.dumps([a.to_dict() for a in articles])
+
+    def cached_path():
+        return fast_json.splice({'articles': cached_articles}, envelope())
+
+    results = {}
+    with flask_app.app_context():
+        for name, fn in (('jsonify', jsonify_path), ('fast_json', fast_path), ('pre_serialized', cached_path)):
+            fn()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            results[name] = round((time.perf_counter() - start) / iterations * 1e6, 2)
+    results['encoder'] = 'orjson' if fast_json.ORJSON_AVAILABLE else 'json'
+    return results
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a list of regressions beyond the tolerance (fraction, e.g. 0.2 = 20%)"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if previous['throughput'] and current['throughput'] < previous['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']}/s vs baseline {previous['throughput']}/s")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{name}: {current['errors']} errors vs baseline {previous['errors']}")
+    return regressions
+
+
+def _data_paths(data_dir: str) -> dict:
+    """Environment pointing every on-disk store at `data_dir`, away from the real ones"""
+    return {
+        'CACHE_PATH': os.path.join(data_dir, 'cache.sqlite3'),
+        'USERS_DB_PATH': os.path.join(data_dir, 'users.sqlite3'),
+        'SHARES_DB_PATH': os.path.join(data_dir, 'shares.sqlite3'),
+        'PREFERENCES_DB_PATH': os.path.join(data_dir, 'preferences.sqlite3'),
+        'IMAGE_CACHE_DIR': os.path.join(data_dir, 'images'),
+        'SHARE_PREVIEW_DIR': os.path.join(data_dir, 'share_previews'),
+        'JOB_QUEUE_PATH': os.path.join(data_dir, 'jobs.sqlite3'),
+    }
+
+
+def _cache_env(cache_l2: str, no_cache: bool) -> dict:
+    """Cache settings; without the cache every /api/news request runs the full pipeline"""
+    if no_cache:
+        return {'CACHE_L2': 'none', 'CACHE_L1_MAX_ENTRIES': '0'}
+    return {'CACHE_L2': cache_l2}
+
+
+def load_app(args, newsapi_base_url: str):
+    """Import the Flask app wired to the fake upstreams"""
+    # Bench accounts and shares go to a scratch directory, not backend/data
+    os.environ.update(_data_paths(tempfile.mkdtemp(prefix='newsdd-bench-')))
+    os.environ['NEWS_API_BASE_URL'] = newsapi_base_url
+    os.environ.setdefault('NEWS_API_KEY', 'bench-key')
+    # Keep the real Gemini/Translate clients from initialising; fakes are injected below
+    os.environ['GEMINI_API_KEY'] = ''
+    os.environ['GOOGLE_TRANSLATE_KEY'] = ''
+    # Start from an isolated, empty cache so runs are comparable
+    os.environ.update(_cache_env(args.cache_l2, args.no_cache))
+    os.environ['CACHE_WARM_START'] = 'false'
+    # Background workers would not see the fakes injected below
+    os.environ['ENRICHMENT_MODE'] = 'sync'
+    import app as app_module
+
+    app_module.news_service.gemini_model = FakeGeminiModel(UpstreamBehavior(
+        args.gemini_latency_ms, args.jitter_ms, args.gemini_error_rate, args.gemini_quota, args.seed
+    ))
+    app_module.news_service.translate_client = FakeTranslateClient(UpstreamBehavior(
+        args.translate_latency_ms, args.jitter_ms, args.translate_error_rate, None, args.seed
+    ))
+    return app_module.app
+
+
+def launch_server(launcher: str, newsapi_base_url: str, cache_l2: str, data_dir: str, enrichment_mode: str = 'sync',
+                  no_cache: bool = False):
+    """Start the app under `launcher` on a free port; returns (process, base URL)"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        NEWS_API_BASE_URL=newsapi_base_url,
+        NEWS_API_KEY=os.getenv('NEWS_API_KEY', 'bench-key'),
+        GEMINI_API_KEY='',
+        GOOGLE_TRANSLATE_KEY='',
+        **_cache_env(cache_l2, no_cache),
+        CACHE_WARM_START='false',
+        ENRICHMENT_MODE=enrichment_mode,
+        **_data_paths(data_dir)
+    )
+    process = subprocess.Popen(LAUNCHERS[launcher], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    client = HTTPClient(base_url)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{launcher} server exited with code {process.returncode}")
+        try:
+            if client.request('GET', '/api/health')[0] == 200:
+                return process, base_url
+        except Exception:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{launcher} server did not become healthy within 60s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the News Dashboard Backend offline')
+    parser.add_argument('--target', help='Base URL of a running server; default runs the app in-process')
+    parser.add_argument('--launcher', choices=sorted(LAUNCHERS),
+                        help='Start the server as a subprocess: dev (python app.py) or gunicorn (gunicorn.conf.py)')
+    parser.add_argument('--enrichment', default='sync', choices=['sync', 'async'],
+                        help='ENRICHMENT_MODE for --launcher servers (async queues summaries for worker.py)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Comma-separated subset of {SCENARIOS}")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--user-language', default='en', help='userLanguage for /api/news (non-en exercises translation)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--newsapi-latency-ms', type=float, default=150)
+    parser.add_argument('--newsapi-error-rate', type=float, default=0.0)
+    parser.add_argument('--newsapi-quota', type=int, default=None)
+    parser.add_argument('--gemini-latency-ms', type=float, default=800)
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-quota', type=int, default=None)
+    parser.add_argument('--translate-latency-ms', type=float, default=80)
+    parser.add_argument('--translate-error-rate', type=float, default=0.0)
+    parser.add_argument('--cache-l2', default='memory', choices=['none', 'memory', 'disk'],
+                        help='L2 store behind the per-process L1 cache (default: empty in-memory store; disk shares it '
+                             'between gunicorn workers). The L1 stays on, so repeated news requests are cache hits')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable both cache tiers so every news request fetches, summarizes and translates; '
+                             'use for regression gates on the processing pipeline (ignored with --target)')
+    parser.add_argument('--serialization', action='store_true',
+                        help='Only run the /api/news serialization micro-benchmark (jsonify vs fast encoder vs cached bytes)')
+    parser.add_argument('--iterations', type=int, default=2000, help='Iterations for --serialization')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--save-baseline', help='Store results as the regression baseline')
+    parser.add_argument('--baseline', help='Compare against this baseline and exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed regression as a fraction (default 0.2)')
+    args = parser.parse_args(argv)
+    if args.serialization and (args.target or args.launcher):
+        parser.error('--serialization runs in-process; omit --target/--launcher')
+    if args.target and args.launcher:
+        parser.error('--target and --launcher are mutually exclusive')
+
+    fake_newsapi = None
+    server = None
+    if args.target:
+        make_client = lambda: HTTPClient(args.target)
+    elif args.launcher:
+        fake_newsapi = FakeNewsAPIServer(UpstreamBehavior(
+            args.newsapi_latency_ms, args.jitter_ms, args.newsapi_error_rate, args.newsapi_quota, args.seed
+        )).start()
+        data_dir = tempfile.mkdtemp(prefix='newsdd-bench-')
+        try:
+            server, base_url = launch_server(args.launcher, fake_newsapi.base_url, args.cache_l2, data_dir,
+                                             args.enrichment, args.no_cache)
+        except Exception:
+            fake_newsapi.stop()
+            raise
+        print(f"{args.launcher} server listening on {base_url}")
+        make_client = lambda: HTTPClient(base_url)
+    else:
+        fake_newsapi = FakeNewsAPIServer(UpstreamBehavior(
+            args.newsapi_latency_ms, args.jitter_ms, args.newsapi_error_rate, args.newsapi_quota, args.seed
+        )).start()
+        flask_app = load_app(args, fake_newsapi.base_url)
+        make_client = lambda: InProcessClient(flask_app)
+
+    if args.serialization:
+        try:
+            timings = bench_serialization(flask_app, args.iterations)
+        finally:
+            fake_newsapi.stop()
+        print(f"Serialization per request ({timings['encoder']}): jsonify {timings['jsonify']}us, "
+              f"fast encoder {timings['fast_json']}us, pre-serialized {timings['pre_serialized']}us")
+        return 0
+
+    results = {}
+    try:
+        for name in [s.strip() for s in args.scenarios.split(',') if s.strip()]:
+            run = build_scenario(name, make_client(), args.user_language)
+            results[name] = run_scenario(run, make_client, args.requests, args.concurrency, args.warmup)
+            r = results[name]
+            print(f"{name:8} {r['throughput']:>9.2f} req/s  p50 {r['p50_ms']:>9.2f}ms  "
+                  f"p95 {r['p95_ms']:>9.2f}ms  p99 {r['p99_ms']:>9.2f}ms  errors {r['errors']}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+        if fake_newsapi:
+            fake_newsapi.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("✗ Performance regression detected:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print(f"✓ Within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
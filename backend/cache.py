@@ -0,0 +1,395 @@
+"""
+Two-tier cache shared across workers.
+
+L1 is a per-process LRU; L2 is shared by every worker on the host (SQLite
+file) or across hosts (Redis or any server speaking its protocol). Values are
+packed with msgpack and zstd when installed, falling back to JSON and zlib,
+and every key is namespaced with CACHE_SCHEMA_VERSION so a format change only
+needs a version bump.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from metrics import CACHE_REQUESTS
+from sqlite_db import ThreadLocalSQLite
+
+# Try to import the compact codecs
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Try to import the Redis client
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Bump when the shape of any cached value changes
+CACHE_SCHEMA_VERSION = 6
+
+# Values smaller than this are stored uncompressed
+_COMPRESS_MIN_BYTES = 512
+
+if ZSTD_AVAILABLE:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def pack(value: Any) -> bytes:
+    """Serialize to a 2-byte header (codec, compression) followed by the payload"""
+    if isinstance(value, bytes):
+        # Already-encoded values (e.g. pre-serialized JSON bodies) are stored as-is
+        codec, body = b'B', value
+    elif MSGPACK_AVAILABLE:
+        codec, body = b'M', msgpack.packb(value, use_bin_type=True)
+    else:
+        codec, body = b'J', json.dumps(value, separators=(',', ':')).encode('utf-8')
+    if len(body) < _COMPRESS_MIN_BYTES:
+        return codec + b'-' + body
+    if ZSTD_AVAILABLE:
+        return codec + b'Z' + _zstd_compressor.compress(body)
+    return codec + b'z' + zlib.compress(body, 6)
+
+
+def unpack(data: bytes) -> Any:
+    codec, compression, body = data[:1], data[1:2], data[2:]
+    if compression == b'Z':
+        if not ZSTD_AVAILABLE:
+            raise ValueError('zstd-compressed cache entry but zstandard is not installed')
+        body = _zstd_decompressor.decompress(body)
+    elif compression == b'z':
+        body = zlib.decompress(body)
+    if codec == b'B':
+        return bytes(body)
+    if codec == b'M':
+        if not MSGPACK_AVAILABLE:
+            raise ValueError('msgpack cache entry but msgpack is not installed')
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+class MemoryLRU:
+    """Per-process L1: bounded LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class MemoryStore:
+    """L2 stand-in that lives in this process; useful for tests and benchmarks"""
+
+    def __init__(self):
+        self._data = {}
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] and entry[1] < time.time()):
+                return None
+            self._hits[key] = self._hits.get(key, 0) + 1
+            return entry
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (data, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._hits.pop(key, None)
+
+    def hot_keys(self, prefix: str, limit: int) -> List[str]:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            return sorted(keys, key=lambda k: self._hits.get(k, 0), reverse=True)[:limit]
+
+
+class SQLiteStore:
+    """L2 shared by all workers on the host through a WAL-mode SQLite file.
+
+    Reads never write: hit counts and access times are collected in memory and
+    flushed in one transaction every HIT_FLUSH_INTERVAL_S or HIT_FLUSH_BATCH hits,
+    so readers in different workers do not queue on SQLite's single writer lock.
+    """
+
+    HIT_FLUSH_INTERVAL_S = 30.0
+    HIT_FLUSH_BATCH = 1000
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        self._hits_lock = threading.Lock()
+        self._pending_hits = {}
+        self._last_flush = time.monotonic()
+        self._db = ThreadLocalSQLite(path, [
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, '
+            'last_access REAL NOT NULL DEFAULT 0)'
+        ], synchronous='NORMAL')
+        conn = self._db.conn()
+        # Files created before last_access existed
+        if 'last_access' not in [row[1] for row in conn.execute('PRAGMA table_info(cache)')]:
+            conn.execute('ALTER TABLE cache ADD COLUMN last_access REAL NOT NULL DEFAULT 0')
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_hits ON cache (hits)')
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)')
+        conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        row = self._db.conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        # Expired rows are left for _prune so that a read stays a read
+        if row is None or (row[1] and row[1] < time.time()):
+            return None
+        with self._hits_lock:
+            hits, _ = self._pending_hits.get(key, (0, 0.0))
+            self._pending_hits[key] = (hits + 1, time.time())
+            due = (len(self._pending_hits) >= self.HIT_FLUSH_BATCH
+                   or time.monotonic() - self._last_flush > self.HIT_FLUSH_INTERVAL_S)
+        if due:
+            self.flush_hits()
+        return bytes(row[0]), row[1]
+
+    def flush_hits(self) -> None:
+        """Write the hit counts and access times collected since the last flush"""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        conn = self._db.conn()
+        try:
+            conn.executemany(
+                'UPDATE cache SET hits = hits + ?, last_access = MAX(last_access, ?) WHERE key = ?',
+                [(hits, accessed, key) for key, (hits, accessed) in pending.items()]
+            )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # Counts only steer warm start and eviction; losing a batch is harmless
+            conn.rollback()
+            print(f"Cache hit flush skipped: {e}")
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        conn = self._db.conn()
+        conn.execute(
+            'INSERT INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, '
+            'last_access = excluded.last_access',
+            (key, sqlite3.Binary(data), expires_at, time.time())
+        )
+        conn.commit()
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        self.flush_hits()
+        conn.execute('DELETE FROM cache WHERE expires_at > 0 AND expires_at < ?', (time.time(),))
+        # Least recently written or read first, so fresh entries outlive stale popular ones
+        conn.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access ASC LIMIT '
+            'MAX(0, (SELECT COUNT(*) FROM cache) - ?))',
+            (self.max_entries,)
+        )
+        conn.commit()
+
+    def delete(self, key: str) -> None:
+        conn = self._db.conn()
+        conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+        conn.commit()
+
+    def hot_keys(self, prefix: str, limit: int) -> List[str]:
+        self.flush_hits()
+        rows = self._db.conn().execute(
+            'SELECT key FROM cache WHERE key >= ? AND key < ? AND (expires_at = 0 OR expires_at > ?) '
+            'ORDER BY hits DESC LIMIT ?',
+            (prefix, prefix + '\uffff', time.time(), limit)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+
+class RedisStore:
+    """L2 backed by Redis or any server speaking its protocol"""
+
+    # Each entry's hit count lives in a companion key with the same TTL, so counts
+    # expire with their entries instead of piling up
+    HITS_PREFIX = 'newsdd:cache:hits:'
+
+    def __init__(self, url: str):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError('redis package not installed')
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        hits_key = self.HITS_PREFIX + key
+        pipe = self.client.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        pipe.incr(hits_key)
+        data, ttl_ms, _ = pipe.execute()
+        if data is None:
+            # INCR created a counter for a missing entry; drop it rather than leave it without a TTL
+            self.client.delete(hits_key)
+            return None
+        return data, (time.time() + ttl_ms / 1000.0) if ttl_ms and ttl_ms > 0 else 0.0
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        ttl_ms = max(1, int((expires_at - time.time()) * 1000)) if expires_at else None
+        pipe = self.client.pipeline()
+        pipe.set(key, data, px=ttl_ms)
+        pipe.set(self.HITS_PREFIX + key, 0, px=ttl_ms)
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key, self.HITS_PREFIX + key)
+
+    def hot_keys(self, prefix: str, limit: int) -> List[str]:
+        # Only used at warm start, so a SCAN over the counters is acceptable
+        counter_keys = list(self.client.scan_iter(match=f"{self.HITS_PREFIX}{prefix}*", count=1000))
+        if not counter_keys:
+            return []
+        counts = self.client.mget(counter_keys)
+        ranked = sorted(zip(counter_keys, counts), key=lambda kc: int(kc[1] or 0), reverse=True)[:limit]
+        keys = [k.decode() if isinstance(k, bytes) else k for k, _ in ranked]
+        return [k[len(self.HITS_PREFIX):] for k in keys]
+
+
+class TwoTierCache:
+    def __init__(self, l2=None, l1_max_entries: int = 2048, namespace: str = 'newsdd'):
+        self.l1 = MemoryLRU(l1_max_entries)
+        self.l2 = l2
+        self.prefix = f"{namespace}:v{CACHE_SCHEMA_VERSION}:"
+
+    def _key(self, cache: str, key: str) -> str:
+        return f"{self.prefix}{cache}:{key}"
+
+    def get(self, cache: str, key: str) -> Tuple[bool, Any]:
+        """Return (found, value), checking L1 then L2"""
+        full_key = self._key(cache, key)
+        found, value = self.l1.get(full_key)
+        if found:
+            CACHE_REQUESTS.inc(cache, 'hit_l1')
+            return True, value
+        if self.l2 is not None:
+            try:
+                entry = self.l2.get(full_key)
+                if entry is not None:
+                    data, expires_at = entry
+                    value = unpack(data)
+                    self.l1.set(full_key, value, expires_at)
+                    CACHE_REQUESTS.inc(cache, 'hit_l2')
+                    return True, value
+            except Exception as e:
+                print(f"Cache L2 read error: {e}")
+        CACHE_REQUESTS.inc(cache, 'miss')
+        return False, None
+
+    def set(self, cache: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        full_key = self._key(cache, key)
+        expires_at = time.time() + ttl if ttl else 0.0
+        self.l1.set(full_key, value, expires_at)
+        if self.l2 is not None:
+            try:
+                self.l2.set(full_key, pack(value), expires_at)
+            except Exception as e:
+                print(f"Cache L2 write error: {e}")
+
+    def delete(self, cache: str, key: str) -> None:
+        full_key = self._key(cache, key)
+        self.l1.delete(full_key)
+        if self.l2 is not None:
+            try:
+                self.l2.delete(full_key)
+            except Exception as e:
+                print(f"Cache L2 delete error: {e}")
+
+    def get_or_set(self, cache: str, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        found, value = self.get(cache, key)
+        if found:
+            return value
+        value = compute()
+        self.set(cache, key, value, ttl)
+        return value
+
+    def warm_start(self, limit: int = 500) -> int:
+        """Preload the most frequently read L2 entries into L1; returns the number loaded"""
+        if self.l2 is None:
+            return 0
+        loaded = 0
+        try:
+            for full_key in self.l2.hot_keys(self.prefix, limit):
+                entry = self.l2.get(full_key)
+                if entry is None:
+                    continue
+                self.l1.set(full_key, unpack(entry[0]), entry[1])
+                loaded += 1
+        except Exception as e:
+            print(f"Cache warm start error: {e}")
+        return loaded
+
+
+def build_cache(config) -> TwoTierCache:
+    """Create the cache from app config (CACHE_L2 = disk | redis | memory | none)"""
+    backend = (config.get('CACHE_L2') or 'none').lower()
+    l2 = None
+    try:
+        if backend == 'disk':
+            l2 = SQLiteStore(config.get('CACHE_PATH') or 'cache/newsdd_cache.sqlite3')
+        elif backend == 'redis':
+            l2 = RedisStore(config.get('REDIS_URL') or 'redis://localhost:6379/0')
+        elif backend == 'memory':
+            l2 = MemoryStore()
+        print(f"✓ Cache initialized (L2: {backend})")
+    except Exception as e:
+        print(f"✗ Failed to initialize {backend} cache, using in-process cache only: {e}")
+        l2 = None
+
+    cache = TwoTierCache(l2, l1_max_entries=config.get('CACHE_L1_MAX_ENTRIES', 2048))
+    if config.get('CACHE_WARM_START'):
+        loaded = cache.warm_start(config.get('CACHE_WARM_START_KEYS', 500))
+        print(f"✓ Cache warm start loaded {loaded} entries")
+    return cache
@@ -6,6 +6,7 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     NEWS_API_KEY = os.getenv('NEWS_API_KEY')
+    NEWS_API_BASE_URL = os.getenv('NEWS_API_BASE_URL', 'https://newsapi.org/v2')
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
@@ -14,4 +15,62 @@ class Config:
     GOOGLE_TRANSLATE_KEY = os.getenv('GOOGLE_TRANSLATE_KEY')
     
     # Frontend URL - use production URL in production, localhost in development
-    FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://news-dd.vercel.app/' if os.getenv('FLASK_ENV') == 'production' else 'http://localhost:3000')
\ No newline at end of file
+    FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://news-dd.vercel.app/' if os.getenv('FLASK_ENV') == 'production' else 'http://localhost:3000')
+    
+    # Summarizer backends in routing order, and the per-request summarization budget
+    SUMMARIZER_BACKENDS = [b for b in os.getenv('SUMMARIZER_BACKENDS', 'gemini,extractive').split(',') if b.strip()]
+    SUMMARY_BUDGET_MS = float(os.getenv('SUMMARY_BUDGET_MS', '15000'))
+    GEMINI_QUOTA_COOLDOWN_S = float(os.getenv('GEMINI_QUOTA_COOLDOWN_S', '60'))
+    
+    # Concurrency for /api/news/batch fan-out
+    FANOUT_MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', '8'))
+    BATCH_MAX_CATEGORIES = int(os.getenv('BATCH_MAX_CATEGORIES', '10'))
+    
+    # Two-tier cache: per-process L1 backed by a shared L2 (disk, redis, memory or none)
+    CACHE_L2 = os.getenv('CACHE_L2', 'disk')
+    CACHE_PATH = os.getenv('CACHE_PATH', 'cache/newsdd_cache.sqlite3')
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_L1_MAX_ENTRIES = int(os.getenv('CACHE_L1_MAX_ENTRIES', '2048'))
+    CACHE_WARM_START = os.getenv('CACHE_WARM_START', 'true').lower() == 'true'
+    CACHE_WARM_START_KEYS = int(os.getenv('CACHE_WARM_START_KEYS', '500'))
+    NEWS_CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', '300'))
+    SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', str(7 * 24 * 3600)))
+    # How long a feed version stays usable as a /api/news?since= cursor
+    FEED_SNAPSHOT_TTL = int(os.getenv('FEED_SNAPSHOT_TTL', str(24 * 3600)))
+    
+    # Summaries and translations: 'async' returns articles at once with summaryStatus
+    # 'pending' and leaves the work to worker.py processes; 'sync' does it in the request
+    ENRICHMENT_MODE = os.getenv('ENRICHMENT_MODE', 'async').lower()
+    JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', 'data/jobs.sqlite3')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    # Backpressure: past this many waiting jobs, new articles get a local summary instead
+    JOB_QUEUE_MAX_PENDING = int(os.getenv('JOB_QUEUE_MAX_PENDING', '1000'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_LEASE_S = float(os.getenv('JOB_LEASE_S', '120'))
+    ENRICHMENT_MAX_IDS = int(os.getenv('ENRICHMENT_MAX_IDS', '100'))
+    
+    # SQLite files holding accounts, share links and per-user preferences; shared by
+    # every worker process on the host
+    USERS_DB_PATH = os.getenv('USERS_DB_PATH', 'data/users.sqlite3')
+    SHARES_DB_PATH = os.getenv('SHARES_DB_PATH', 'data/shares.sqlite3')
+    PREFERENCES_DB_PATH = os.getenv('PREFERENCES_DB_PATH', 'data/preferences.sqlite3')
+    
+    # Pre-rendered Open Graph pages served to link-preview bots at /shared/<id>
+    SHARE_PREVIEW_DIR = os.getenv('SHARE_PREVIEW_DIR', 'cache/share_previews')
+    SHARE_PREVIEW_MEMORY_ENTRIES = int(os.getenv('SHARE_PREVIEW_MEMORY_ENTRIES', '1024'))
+    
+    # Image proxy: thumbnails are cached on disk; article images are only rewritten
+    # to the proxy when the public URL of this API is known
+    PUBLIC_API_URL = os.getenv('PUBLIC_API_URL', '')
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', 'cache/images')
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+    
+    # Request tracing: slow/failed requests are always kept, the rest sampled
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.05'))
+    TRACE_SLOW_THRESHOLD_MS = float(os.getenv('TRACE_SLOW_THRESHOLD_MS', '2000'))
+    TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '200'))
+    TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '256'))
+    TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH')
+    
+    # Token required by /api/admin/* endpoints; admin endpoints are disabled when unset
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
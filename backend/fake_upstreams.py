@@ -0,0 +1,192 @@
+"""
+Local stand-ins for NewsAPI, Gemini and Google Translate.
+
+Used by benchmark.py to measure the backend without live API keys. Each fake
+has configurable latency, error rate and a request quota after which it
+answers the way the real service does when rate limited.
+
+Run a standalone fake NewsAPI server with:
+    python fake_upstreams.py --port 9100 --latency-ms 150
+and point the backend at it with NEWS_API_BASE_URL=http://127.0.0.1:9100/v2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+CATEGORIES = ['general', 'business', 'technology', 'science', 'health', 'sports', 'entertainment']
+
+_SENTENCES = [
+    "Officials confirmed the announcement on Monday after weeks of speculation.",
+    "Analysts said the move could reshape the market over the coming year.",
+    "The company reported stronger than expected quarterly results.",
+    "Researchers published their findings in a peer-reviewed journal.",
+    "Local residents expressed mixed reactions to the decision.",
+    "The proposal will be debated by lawmakers later this month.",
+    "Experts warned that further delays could increase costs significantly.",
+    "The new system is expected to roll out to all users by the end of the year.",
+]
+
+
+class UpstreamBehavior:
+    """Latency, error rate and quota shared by all the fakes"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 quota: Optional[int] = None, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota = quota
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def next_call(self) -> str:
+        """Sleep for the configured latency and return 'ok', 'error' or 'quota'"""
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.quota is not None and calls > self.quota:
+            return 'quota'
+        return 'error' if failed else 'ok'
+
+
+def make_articles(category: str, page_size: int, seed: int = 0):
+    """Deterministic NewsAPI-shaped articles for a category"""
+    rng = random.Random(f"{category}:{seed}")
+    articles = []
+    for i in range(page_size):
+        body = ' '.join(rng.sample(_SENTENCES, 4))
+        articles.append({
+            'source': {'id': None, 'name': f"Fake {category.title()} Wire"},
+            'author': 'Bench Reporter',
+            'title': f"{category.title()} headline {i}: {rng.choice(_SENTENCES)[:60]}",
+            'description': ' '.join(rng.sample(_SENTENCES, 2)),
+            'url': f"https://example.com/{category}/{seed}/{i}",
+            'urlToImage': f"https://example.com/{category}/{i}.jpg",
+            'publishedAt': f"2024-01-01T{i % 24:02d}:00:00Z",
+            'content': body[:200] + ' [+1234 chars]'
+        })
+    return articles
+
+
+class FakeNewsAPIServer:
+    """Threaded HTTP server answering /v2/top-headlines and /v2/everything"""
+
+    def __init__(self, behavior: Optional[UpstreamBehavior] = None, host: str = '127.0.0.1', port: int = 0):
+        self.behavior = behavior or UpstreamBehavior()
+        behavior = self.behavior
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path not in ('/v2/top-headlines', '/v2/everything'):
+                    return self._send(404, {'status': 'error', 'code': 'notFound', 'message': 'Not found'})
+                outcome = behavior.next_call()
+                if outcome == 'quota':
+                    return self._send(429, {
+                        'status': 'error', 'code': 'rateLimited',
+                        'message': 'You have made too many requests recently.'
+                    })
+                if outcome == 'error':
+                    return self._send(500, {'status': 'error', 'code': 'unexpectedError', 'message': 'Fake upstream error'})
+                category = params.get('category') or params.get('q') or 'general'
+                page_size = int(params.get('pageSize', 20))
+                articles = make_articles(category, page_size)
+                self._send(200, {'status': 'ok', 'totalResults': len(articles), 'articles': articles})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def start(self) -> 'FakeNewsAPIServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Drop-in for genai.GenerativeModel; assign to NewsService.gemini_model"""
+
+    def __init__(self, behavior: Optional[UpstreamBehavior] = None):
+        self.behavior = behavior or UpstreamBehavior(latency_ms=800)
+
+    def generate_content(self, prompt: str) -> _FakeGeminiResponse:
+        outcome = self.behavior.next_call()
+        if outcome == 'quota':
+            raise Exception("429 Resource has been exhausted (e.g. check quota).")
+        if outcome == 'error':
+            raise Exception("500 Internal error encountered.")
+        lines = [line.strip() for line in prompt.splitlines() if line.strip().startswith(('Title:', 'Description:'))]
+        return _FakeGeminiResponse(' '.join(line.split(':', 1)[1].strip() for line in lines)[:300])
+
+
+class FakeTranslateClient:
+    """Drop-in for google.cloud.translate.Client; assign to NewsService.translate_client"""
+
+    def __init__(self, behavior: Optional[UpstreamBehavior] = None):
+        self.behavior = behavior or UpstreamBehavior(latency_ms=80)
+
+    def translate(self, text: str, target_language: str = 'en', **kwargs):
+        outcome = self.behavior.next_call()
+        if outcome == 'quota':
+            raise Exception("403 User Rate Limit Exceeded")
+        if outcome == 'error':
+            raise Exception("500 Backend Error")
+        return {'translatedText': f"[{target_language}] {text}",
+                'detectedSourceLanguage': kwargs.get('source_language') or 'en'}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a fake NewsAPI server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--quota', type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeNewsAPIServer(
+        UpstreamBehavior(args.latency_ms, args.jitter_ms, args.error_rate, args.quota),
+        host=args.host, port=args.port
+    )
+    print(f"Fake NewsAPI listening on {fake.base_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
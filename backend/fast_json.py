@@ -0,0 +1,31 @@
+"""
+Fast JSON encoding for hot response paths.
+
+Uses orjson when installed and falls back to the standard library. Both
+produce compact UTF-8 bytes that can be cached and sent as-is.
+"""
+import json
+from typing import Any, Dict
+
+# Try to import orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    print("Warning: orjson not installed. Falling back to the standard json encoder.")
+    ORJSON_AVAILABLE = False
+
+
+def dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def splice(encoded: Dict[str, bytes], fields: Dict[str, Any]) -> bytes:
+    """Encode `fields` into an object that also contains the already-encoded values in `encoded`"""
+    body = dumps(fields)
+    parts = [b'"' + key.encode('utf-8') + b'":' + value for key, value in encoded.items()]
+    if body != b'{}':
+        parts.append(body[1:-1])
+    return b'{' + b','.join(parts) + b'}'
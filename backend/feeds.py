@@ -0,0 +1,39 @@
+"""
+Versioned feeds for delta sync.
+
+A feed version is a hash of its ordered article IDs, so every worker derives
+the same version for the same page without coordinating. Each version's ID
+list is kept in the shared cache for a while; a client polling with
+since=<version> gets the IDs added and removed since then, or a full resync
+once that snapshot has expired.
+"""
+import hashlib
+from typing import List, Optional, Tuple
+
+
+def feed_version(ids: List[str]) -> str:
+    digest = hashlib.sha1('\n'.join(ids).encode('utf-8')).hexdigest()
+    return digest[:16]
+
+
+class FeedTracker:
+    def __init__(self, cache, snapshot_ttl: float = 24 * 3600):
+        self.cache = cache
+        self.snapshot_ttl = snapshot_ttl
+
+    def record(self, feed_key: str, ids: List[str]) -> str:
+        """Store the snapshot for this page and return its version"""
+        version = feed_version(ids)
+        self.cache.set('feed', f"{feed_key}:{version}", ids, ttl=self.snapshot_ttl)
+        return version
+
+    def diff(self, feed_key: str, since: str, ids: List[str]) -> Optional[Tuple[List[str], List[str]]]:
+        """(added, removed) IDs between version `since` and `ids`; None if `since` is unknown"""
+        found, previous = self.cache.get('feed', f"{feed_key}:{since}")
+        if not found:
+            return None
+        previous_set = set(previous)
+        current_set = set(ids)
+        added = [i for i in ids if i not in previous_set]
+        removed = [i for i in previous if i not in current_set]
+        return added, removed
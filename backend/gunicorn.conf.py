@@ -0,0 +1,69 @@
+"""
+Gunicorn settings for the News Dashboard Backend.
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+Each worker process runs a pool of threads, so slow upstream calls (NewsAPI,
+Gemini, Translate) do not block a whole process. The app is imported once in
+the master before forking; workers share its memory copy-on-write and start
+serving immediately. Every setting below can be overridden from the
+environment.
+
+Reloading:
+    kill -HUP <master>    restart workers gracefully (in-flight requests finish)
+    kill -USR2 <master>   start a new master with new code, then
+    kill -QUIT <old>      stop the old one; needed for code changes since the
+                          app is preloaded in the master
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Process-and-thread model
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+worker_class = 'gthread'
+threads = _env_int('GUNICORN_THREADS', 4)
+
+# Import the app (and numpy, Pillow, the cache warm start) once before fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers after N requests to cap memory growth; jitter keeps them
+# from all restarting at the same moment
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Summaries may take up to SUMMARY_BUDGET_MS, so allow well beyond that
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Pending connections queued by the kernel, and idle keep-alive per connection
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Background summarize/translate workers run next to the web workers
+_job_workers = None
+
+
+def when_ready(server):
+    global _job_workers
+    from config import Config
+    if Config.ENRICHMENT_MODE == 'async' and Config.JOB_WORKERS > 0:
+        from jobs import spawn_worker_pool
+        _job_workers = spawn_worker_pool(Config.JOB_WORKERS)
+        server.log.info("Started job worker supervisor (pid %s)", _job_workers.pid)
+
+
+def on_exit(server):
+    if _job_workers and _job_workers.poll() is None:
+        _job_workers.terminate()
+        _job_workers.wait(timeout=graceful_timeout + 30)
@@ -0,0 +1,289 @@
+"""
+Image proxy with an on-disk thumbnail cache.
+
+Article images are fetched once through a pooled HTTP session, resized to one
+of a few standard widths, re-encoded as WebP and kept in a size-bounded LRU
+directory. Files are named by the hash of their content, so the same image
+published under several URLs is stored once. Proxy URLs are signed with the
+app's secret key so the endpoint cannot be used to fetch arbitrary URLs.
+"""
+import hashlib
+import hmac
+import io
+import ipaddress
+import mimetypes
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import create_connection
+
+from metrics import CACHE_REQUESTS, STAGE_SECONDS, UPSTREAM_ERRORS
+from sqlite_db import ThreadLocalSQLite
+
+# Try to import Pillow for resizing
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    print("Warning: Pillow not installed. Proxied images will be served at original size.")
+    PIL_AVAILABLE = False
+
+THUMBNAIL_WIDTHS = (160, 320, 640, 1024)
+DEFAULT_WIDTH = 640
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+MAX_REDIRECTS = 3
+
+
+class ImageProxyError(Exception):
+    def __init__(self, message: str, status: int = 502):
+        super().__init__(message)
+        self.status = status
+
+
+def snap_width(width: Optional[int]) -> int:
+    """Closest standard thumbnail width at or above the requested one"""
+    if not width:
+        return DEFAULT_WIDTH
+    for candidate in THUMBNAIL_WIDTHS:
+        if width <= candidate:
+            return candidate
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def _check_scheme(url: str) -> None:
+    """Refuse URLs that are not http(s)"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ImageProxyError('Only http(s) image URLs are supported', 400)
+
+
+def _public_address(host: str, port: int) -> str:
+    """An address of `host` to connect to; refuses hosts that resolve to any private address"""
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise ImageProxyError('Image host could not be resolved')
+    for info in infos:
+        if not ipaddress.ip_address(info[4][0]).is_global:
+            raise ImageProxyError('Image host is not publicly routable', 400)
+    return infos[0][4][0]
+
+
+class _PublicAddressMixin:
+    """Connect to the address that passed the public-host check.
+
+    Resolving once here, rather than checking first and letting the connection
+    resolve again, closes the DNS-rebinding gap between the two lookups. TLS
+    still verifies the certificate against the hostname.
+    """
+
+    def _new_conn(self):
+        address = _public_address(self.host, self.port)
+        try:
+            return create_connection((address, self.port), self.timeout, source_address=self.source_address,
+                                     socket_options=self.socket_options)
+        except socket.timeout:
+            raise ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {e}")
+
+
+class _PublicHTTPConnection(_PublicAddressMixin, HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicAddressMixin, HTTPSConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class _PublicOnlyAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections only ever reach publicly routable addresses"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PublicHTTPConnectionPool,
+            'https': _PublicHTTPSConnectionPool
+        }
+
+
+class ThumbnailCache:
+    """Size-bounded LRU of encoded thumbnails; the index is shared by all workers via SQLite"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._db = ThreadLocalSQLite(os.path.join(directory, 'index.sqlite3'), [
+            'CREATE TABLE IF NOT EXISTS thumbnails ('
+            'key TEXT PRIMARY KEY, filename TEXT NOT NULL, mimetype TEXT NOT NULL, '
+            'size INTEGER NOT NULL, last_access REAL NOT NULL)',
+            'CREATE INDEX IF NOT EXISTS thumbnails_access ON thumbnails (last_access)'
+        ])
+
+    def get(self, key: str) -> Optional[Tuple[str, str, str]]:
+        """(path, mimetype, etag) for a cached thumbnail"""
+        conn = self._db.conn()
+        row = conn.execute('SELECT filename, mimetype FROM thumbnails WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.directory, row[0])
+        if not os.path.exists(path):
+            conn.execute('DELETE FROM thumbnails WHERE key = ?', (key,))
+            conn.commit()
+            return None
+        conn.execute('UPDATE thumbnails SET last_access = ? WHERE key = ?', (time.time(), key))
+        conn.commit()
+        return path, row[1], os.path.splitext(row[0])[0]
+
+    def put(self, key: str, data: bytes, mimetype: str, extension: str) -> Tuple[str, str, str]:
+        digest = hashlib.sha256(data).hexdigest()
+        filename = f"{digest}.{extension}"
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        conn = self._db.conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO thumbnails (key, filename, mimetype, size, last_access) VALUES (?, ?, ?, ?, ?)',
+            (key, filename, mimetype, len(data), time.time())
+        )
+        conn.commit()
+        self._evict(conn, keep=key)
+        return path, mimetype, digest
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        # Size is counted per distinct file, since several keys can share one
+        total = conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT filename, MAX(size) AS size FROM thumbnails GROUP BY filename)'
+        ).fetchone()[0]
+        while total > self.max_bytes:
+            row = conn.execute(
+                'SELECT key, filename, size FROM thumbnails WHERE key != ? ORDER BY last_access ASC LIMIT 1', (keep,)
+            ).fetchone()
+            if row is None:
+                break
+            key, filename, size = row
+            conn.execute('DELETE FROM thumbnails WHERE key = ?', (key,))
+            still_used = conn.execute('SELECT 1 FROM thumbnails WHERE filename = ? LIMIT 1', (filename,)).fetchone()
+            if not still_used:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+                total -= size
+        conn.commit()
+
+
+class ImageProxy:
+    def __init__(self, secret_key: str, cache_dir: str, max_cache_bytes: int, public_base_url: str = '',
+                 pool_size: int = 20, quality: int = 80):
+        self._secret = secret_key.encode('utf-8')
+        self.public_base_url = public_base_url.rstrip('/')
+        self.quality = quality
+        self.cache = ThumbnailCache(cache_dir, max_cache_bytes)
+        self.session = requests.Session()
+        # Environment proxies would make the proxy, not the image host, the address we check
+        self.session.trust_env = False
+        adapter = _PublicOnlyAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = 'NewsDigest-ImageProxy/1.0'
+
+    def sign(self, url: str) -> str:
+        return hmac.new(self._secret, url.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+    def verify(self, url: str, signature: str) -> bool:
+        return hmac.compare_digest(self.sign(url), signature or '')
+
+    def proxy_url(self, url: Optional[str], width: int = DEFAULT_WIDTH) -> Optional[str]:
+        """Rewrite an article image URL to go through the proxy"""
+        if not url or not self.public_base_url:
+            return url
+        query = urlencode({'url': url, 'w': width, 'sig': self.sign(url)})
+        return f"{self.public_base_url}/api/image?{query}"
+
+    def _download(self, url: str) -> Tuple[bytes, str]:
+        for _ in range(MAX_REDIRECTS + 1):
+            _check_scheme(url)
+            # Redirects are followed by hand so every hop is checked; the adapter
+            # refuses private addresses when it connects
+            response = self.session.get(url, timeout=(3.05, 10), stream=True, allow_redirects=False)
+            if response.is_redirect:
+                url = urljoin(url, response.headers.get('Location', ''))
+                response.close()
+                continue
+            try:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if not content_type.startswith('image/'):
+                    raise ImageProxyError('Upstream URL is not an image')
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data.extend(chunk)
+                    if len(data) > MAX_SOURCE_BYTES:
+                        raise ImageProxyError('Upstream image is too large')
+                return bytes(data), content_type.split(';')[0].strip()
+            finally:
+                response.close()
+        raise ImageProxyError('Too many redirects')
+
+    def _thumbnail(self, data: bytes, content_type: str, width: int) -> Tuple[bytes, str, str]:
+        """(encoded bytes, mimetype, extension); originals pass through without Pillow"""
+        if not PIL_AVAILABLE:
+            extension = (mimetypes.guess_extension(content_type) or '.img').lstrip('.')
+            return data, content_type, extension
+        with STAGE_SECONDS.time('image_resize'):
+            image = Image.open(io.BytesIO(data))
+            image.draft('RGB', (width, width * 4))
+            if image.mode not in ('RGB', 'RGBA'):
+                has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format='WEBP', quality=self.quality, method=4)
+            return out.getvalue(), 'image/webp', 'webp'
+
+    def get(self, url: str, width: int) -> Tuple[str, str, str]:
+        """(path, mimetype, etag) of the thumbnail, fetching and encoding it on a miss"""
+        width = snap_width(width)
+        key = hashlib.sha256(f"{url}\x00{width}".encode('utf-8')).hexdigest()
+        cached = self.cache.get(key)
+        if cached:
+            CACHE_REQUESTS.inc('image', 'hit')
+            return cached
+        CACHE_REQUESTS.inc('image', 'miss')
+        try:
+            with STAGE_SECONDS.time('image_fetch'):
+                data, content_type = self._download(url)
+        except requests.exceptions.RequestException as e:
+            UPSTREAM_ERRORS.inc('image', type(e).__name__)
+            raise ImageProxyError(f"Could not fetch image: {e}")
+        try:
+            encoded, mimetype, extension = self._thumbnail(data, content_type, width)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc('image', 'decode')
+            raise ImageProxyError(f"Could not decode image: {e}")
+        return self.cache.put(key, encoded, mimetype, extension)
@@ -0,0 +1,216 @@
+"""
+Durable background job queue backed by SQLite.
+
+Jobs are deduplicated by a caller-supplied key (a content hash), leased to
+one worker process at a time, and retried with exponential backoff; a job
+whose worker died is picked up again once its lease expires. Finished jobs
+are kept for a while so their results can be looked up by key or by an
+external reference such as an article ID. A handler that could only produce
+a fallback result raises JobIncomplete; it is retried like a failure, and
+after the last attempt its fallback is stored as 'partial', which is served
+but not reused when the same job is asked for again. Enqueueing raises QueueFull once
+too many jobs are waiting, so callers can shed load instead of piling up
+work nobody will wait for.
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlite_db import ThreadLocalSQLite
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+PARTIAL = 'partial'
+FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobIncomplete(Exception):
+    """Raised by a handler whose result is only a fallback; worth retrying later"""
+
+    def __init__(self, message: str, result: Dict):
+        super().__init__(message)
+        self.result = result
+
+
+class JobQueue:
+    def __init__(self, path: str, max_pending: int = 1000, max_attempts: int = 3, lease_s: float = 120,
+                 retry_base_s: float = 5, keep_s: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.lease_s = lease_s
+        self.retry_base_s = retry_base_s
+        self.keep_s = keep_s
+        # Autocommit; multi-statement updates take an explicit write lock
+        self._db = ThreadLocalSQLite(path, [
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, kind TEXT NOT NULL, payload TEXT NOT NULL, '
+            'status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, '
+            'leased_until REAL, result TEXT, error TEXT, updated_at REAL NOT NULL)',
+            'CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)',
+            # External references (e.g. article ID + language) pointing at a job key
+            'CREATE TABLE IF NOT EXISTS job_refs (ref TEXT PRIMARY KEY, key TEXT NOT NULL)'
+        ], timeout=10, autocommit=True)
+
+    def enqueue(self, key: str, kind: str, payload: Dict, ref: Optional[str] = None) -> Dict:
+        """Queue a job unless one with this key exists; returns its {'status', 'result', 'created'}.
+
+        Raises QueueFull when max_pending jobs are already waiting.
+        """
+        now = time.time()
+        conn = self._db.conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if ref:
+                conn.execute('INSERT OR REPLACE INTO job_refs (ref, key) VALUES (?, ?)', (ref, key))
+            row = conn.execute('SELECT status, result FROM jobs WHERE key = ?', (key,)).fetchone()
+            if row and row[0] not in (PARTIAL, FAILED):
+                conn.execute('COMMIT')
+                return {'status': row[0], 'result': json.loads(row[1]) if row[1] else None, 'created': False}
+            waiting = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (PENDING, RUNNING)
+            ).fetchone()[0]
+            if waiting >= self.max_pending:
+                conn.execute('ROLLBACK')
+                raise QueueFull(f"{waiting} jobs already waiting")
+            # A job that exhausted its retries, or only got a fallback result, gets a
+            # fresh start when asked for again
+            conn.execute(
+                'INSERT OR REPLACE INTO jobs (key, kind, payload, status, attempts, available_at, updated_at) '
+                'VALUES (?, ?, ?, ?, 0, ?, ?)',
+                (key, kind, json.dumps(payload), PENDING, now, now)
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return {'status': PENDING, 'result': None, 'created': True}
+
+    def claim(self) -> Optional[Dict]:
+        """Lease the next runnable job ({'id', 'key', 'kind', 'payload', 'attempts'}), or None"""
+        now = time.time()
+        conn = self._db.conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A job whose worker keeps dying with it runs out of attempts like any other failure
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, leased_until = NULL, updated_at = ? '
+                'WHERE status = ? AND leased_until < ? AND attempts >= ?',
+                (FAILED, 'Lease expired', now, RUNNING, now, self.max_attempts)
+            )
+            row = conn.execute(
+                'SELECT id, key, kind, payload, attempts FROM jobs '
+                'WHERE (status = ? AND available_at <= ?) OR (status = ? AND leased_until < ?) '
+                'ORDER BY available_at LIMIT 1',
+                (PENDING, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, leased_until = ?, updated_at = ? WHERE id = ?',
+                (RUNNING, now + self.lease_s, now, row[0])
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return {'id': row[0], 'key': row[1], 'kind': row[2], 'payload': json.loads(row[3]), 'attempts': row[4] + 1}
+
+    def complete(self, job_id: int, result: Dict, partial: bool = False, error: Optional[str] = None) -> None:
+        self._db.conn().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, leased_until = NULL, updated_at = ? WHERE id = ?',
+            (PARTIAL if partial else DONE, json.dumps(result), error, time.time(), job_id)
+        )
+
+    def fail(self, job_id: int, attempts: int, error: str) -> bool:
+        """Record a failed attempt; True if the job will be retried"""
+        now = time.time()
+        retry = attempts < self.max_attempts
+        self._db.conn().execute(
+            'UPDATE jobs SET status = ?, available_at = ?, error = ?, leased_until = NULL, updated_at = ? WHERE id = ?',
+            (PENDING if retry else FAILED, now + self.retry_base_s * 2 ** (attempts - 1), error[:500], now, job_id)
+        )
+        return retry
+
+    def results(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """{key: {'status', 'result'}} for the jobs that exist"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = self._db.conn().execute(
+            f"SELECT key, status, result FROM jobs WHERE key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall()
+        return {key: {'status': status, 'result': json.loads(result) if result else None}
+                for key, status, result in rows}
+
+    def results_by_ref(self, refs: Iterable[str]) -> Dict[str, Dict]:
+        """{ref: {'status', 'result'}} for references that point at a job"""
+        refs = list(refs)
+        if not refs:
+            return {}
+        rows = self._db.conn().execute(
+            f"SELECT ref, key FROM job_refs WHERE ref IN ({','.join('?' * len(refs))})", refs
+        ).fetchall()
+        by_key = self.results(key for _, key in rows)
+        return {ref: by_key[key] for ref, key in rows if key in by_key}
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._db.conn().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def prune(self) -> int:
+        """Drop finished jobs (and their references) older than keep_s"""
+        cutoff = time.time() - self.keep_s
+        conn = self._db.conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            removed = conn.execute(
+                'DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?', (DONE, PARTIAL, FAILED, cutoff)
+            ).rowcount
+            conn.execute('DELETE FROM job_refs WHERE key NOT IN (SELECT key FROM jobs)')
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return removed
+
+
+def run_worker(queue: JobQueue, handlers: Dict[str, Callable[[Dict], Dict]], stop: threading.Event,
+               poll_interval: float = 0.5) -> None:
+    """Claim and run jobs until `stop` is set; a job in progress is finished first"""
+    while not stop.is_set():
+        job = queue.claim()
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        try:
+            result = handlers[job['kind']](job['payload'])
+        except JobIncomplete as e:
+            if job['attempts'] < queue.max_attempts:
+                queue.fail(job['id'], job['attempts'], str(e))
+                print(f"Job {job['key'][:12]} ({job['kind']}) incomplete on attempt {job['attempts']}, will retry: {e}")
+            else:
+                # Out of attempts: serve the fallback rather than nothing
+                queue.complete(job['id'], e.result, partial=True, error=str(e)[:500])
+        except Exception as e:
+            outcome = 'will retry' if queue.fail(job['id'], job['attempts'], f"{type(e).__name__}: {e}") else 'gave up'
+            print(f"Job {job['key'][:12]} ({job['kind']}) failed on attempt {job['attempts']}, {outcome}: {e}")
+        else:
+            queue.complete(job['id'], result)
+
+
+def spawn_worker_pool(processes: int) -> subprocess.Popen:
+    """Start worker.py as a supervisor of `processes` job workers"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'worker.py')
+    return subprocess.Popen([sys.executable, script, '--processes', str(processes)])
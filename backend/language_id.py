@@ -0,0 +1,248 @@
+"""
+Offline language identification for article text.
+
+Languages with their own script are recognised from Unicode ranges. Latin-
+script languages are scored against character trigram profiles (naive Bayes
+with add-one smoothing) built at import from the short samples below. Text
+that is too short or too close to call returns None, so callers can fall
+back to another hint.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Optional
+
+MIN_TRIGRAMS = 12
+# Mean per-trigram log-likelihood lead the best language needs over the runner-up
+MIN_MARGIN = 0.08
+# Lead needed over the expected language (e.g. the feed's) before a short, noisy
+# sample is allowed to contradict it
+HINT_MARGIN = 0.35
+
+_SAMPLES = {
+    'en': (
+        "The government announced on Tuesday that it would increase spending on public health and "
+        "education after months of pressure from opposition parties. Officials said the new budget "
+        "should help schools and hospitals that have struggled with rising costs. Shares of technology "
+        "companies fell sharply as investors worried about interest rates and slower growth. The "
+        "company reported higher than expected profits for the third quarter, driven by strong demand "
+        "for its software and cloud services. Scientists have discovered a new species of frog in the "
+        "rainforest, which they believe could help them understand how climate change affects wildlife. "
+        "The team will play their final match of the season this weekend in front of thousands of fans. "
+        "Police are still investigating what happened and have asked witnesses to come forward with "
+        "any information. The president met with world leaders to discuss trade, security and energy."
+    ),
+    'es': (
+        "El gobierno anunció el martes que aumentará el gasto en sanidad y educación pública después "
+        "de meses de presión por parte de los partidos de la oposición. Los responsables dijeron que el "
+        "nuevo presupuesto ayudará a las escuelas y los hospitales que han sufrido por el aumento de los "
+        "costes. Las acciones de las empresas tecnológicas cayeron con fuerza porque los inversores están "
+        "preocupados por los tipos de interés y un crecimiento más lento. La compañía registró beneficios "
+        "mayores de lo esperado en el tercer trimestre, gracias a la fuerte demanda de sus servicios. Los "
+        "científicos han descubierto una nueva especie de rana en la selva, que según ellos podría ayudar "
+        "a entender cómo el cambio climático afecta a la fauna. El equipo jugará su último partido de la "
+        "temporada este fin de semana ante miles de aficionados. La policía sigue investigando lo ocurrido "
+        "y ha pedido a los testigos que aporten cualquier información. El presidente se reunió con los "
+        "líderes mundiales para hablar de comercio, seguridad y energía."
+    ),
+    'fr': (
+        "Le gouvernement a annoncé mardi qu'il allait augmenter les dépenses de santé et d'éducation "
+        "publique après des mois de pression de la part des partis d'opposition. Les responsables ont "
+        "déclaré que le nouveau budget devrait aider les écoles et les hôpitaux qui souffrent de la hausse "
+        "des coûts. Les actions des entreprises technologiques ont fortement chuté, les investisseurs "
+        "s'inquiétant des taux d'intérêt et d'une croissance plus lente. La société a publié des bénéfices "
+        "supérieurs aux attentes pour le troisième trimestre, portés par une forte demande pour ses "
+        "services. Des scientifiques ont découvert une nouvelle espèce de grenouille dans la forêt "
+        "tropicale, qui pourrait les aider à comprendre comment le changement climatique touche la faune. "
+        "L'équipe jouera son dernier match de la saison ce week-end devant des milliers de supporters. La "
+        "police enquête toujours sur ce qui s'est passé et demande aux témoins de se manifester. Le "
+        "président a rencontré les dirigeants du monde entier pour parler de commerce et d'énergie."
+    ),
+    'de': (
+        "Die Regierung kündigte am Dienstag an, dass sie die Ausgaben für das öffentliche Gesundheitswesen "
+        "und die Bildung nach monatelangem Druck der Oppositionsparteien erhöhen werde. Die Verantwortlichen "
+        "sagten, der neue Haushalt solle Schulen und Krankenhäusern helfen, die unter steigenden Kosten "
+        "leiden. Die Aktien von Technologieunternehmen fielen deutlich, weil sich die Anleger über die Zinsen "
+        "und ein langsameres Wachstum sorgten. Das Unternehmen meldete für das dritte Quartal höhere Gewinne "
+        "als erwartet, getragen von einer starken Nachfrage nach seinen Diensten. Wissenschaftler haben im "
+        "Regenwald eine neue Froschart entdeckt, die ihnen helfen könnte zu verstehen, wie sich der "
+        "Klimawandel auf die Tierwelt auswirkt. Die Mannschaft bestreitet an diesem Wochenende vor tausenden "
+        "Zuschauern ihr letztes Spiel der Saison. Die Polizei ermittelt noch und bittet Zeugen, sich mit "
+        "Hinweisen zu melden. Der Präsident traf sich mit führenden Politikern, um über Handel, Sicherheit "
+        "und Energie zu sprechen."
+    ),
+    'it': (
+        "Il governo ha annunciato martedì che aumenterà la spesa per la sanità e l'istruzione pubblica dopo "
+        "mesi di pressioni da parte dei partiti di opposizione. I responsabili hanno detto che il nuovo "
+        "bilancio dovrebbe aiutare le scuole e gli ospedali che hanno sofferto per l'aumento dei costi. Le "
+        "azioni delle società tecnologiche sono scese bruscamente perché gli investitori sono preoccupati "
+        "per i tassi di interesse e una crescita più lenta. La società ha registrato utili superiori alle "
+        "attese nel terzo trimestre, grazie alla forte domanda per i suoi servizi. Gli scienziati hanno "
+        "scoperto una nuova specie di rana nella foresta pluviale, che secondo loro potrebbe aiutare a capire "
+        "come il cambiamento climatico colpisce la fauna. La squadra giocherà l'ultima partita della "
+        "stagione questo fine settimana davanti a migliaia di tifosi. La polizia sta ancora indagando su "
+        "quanto accaduto e ha chiesto ai testimoni di farsi avanti. Il presidente ha incontrato i leader "
+        "mondiali per discutere di commercio, sicurezza ed energia."
+    ),
+    'pt': (
+        "O governo anunciou na terça-feira que vai aumentar os gastos com saúde e educação pública depois "
+        "de meses de pressão dos partidos da oposição. Os responsáveis disseram que o novo orçamento deve "
+        "ajudar as escolas e os hospitais que têm sofrido com o aumento dos custos. As ações das empresas de "
+        "tecnologia caíram fortemente porque os investidores estão preocupados com as taxas de juros e um "
+        "crescimento mais lento. A empresa registrou lucros acima do esperado no terceiro trimestre, graças "
+        "à forte procura pelos seus serviços. Os cientistas descobriram uma nova espécie de sapo na floresta "
+        "tropical, que segundo eles pode ajudar a entender como as mudanças climáticas afetam os animais. A "
+        "equipe vai disputar a última partida da temporada neste fim de semana diante de milhares de "
+        "torcedores. A polícia ainda está investigando o que aconteceu e pediu que as testemunhas não "
+        "deixem de dar informações. O presidente se reuniu com líderes mundiais para discutir comércio, "
+        "segurança e energia."
+    ),
+    'nl': (
+        "De regering heeft dinsdag aangekondigd dat zij de uitgaven voor de volksgezondheid en het openbaar "
+        "onderwijs zal verhogen na maandenlange druk van de oppositiepartijen. De verantwoordelijken zeiden "
+        "dat de nieuwe begroting scholen en ziekenhuizen moet helpen die te lijden hebben onder de stijgende "
+        "kosten. De aandelen van technologiebedrijven daalden sterk omdat beleggers zich zorgen maken over de "
+        "rente en een tragere groei. Het bedrijf boekte in het derde kwartaal een hogere winst dan verwacht, "
+        "dankzij een sterke vraag naar zijn diensten. Wetenschappers hebben in het regenwoud een nieuwe "
+        "kikkersoort ontdekt, die hen zou kunnen helpen begrijpen hoe de klimaatverandering de dieren "
+        "beïnvloedt. Het team speelt dit weekend voor duizenden supporters zijn laatste wedstrijd van het "
+        "seizoen. De politie onderzoekt nog wat er is gebeurd en vraagt getuigen om zich te melden. De "
+        "president sprak met wereldleiders over handel, veiligheid en energie."
+    ),
+    'sv': (
+        "Regeringen meddelade på tisdagen att den kommer att öka utgifterna för den offentliga hälsovården "
+        "och utbildningen efter flera månaders påtryckningar från oppositionspartierna. De ansvariga sade att "
+        "den nya budgeten ska hjälpa skolor och sjukhus som har drabbats av stigande kostnader. Aktierna i "
+        "teknikföretag föll kraftigt eftersom investerarna oroar sig för räntorna och en långsammare "
+        "tillväxt. Företaget redovisade högre vinst än väntat för det tredje kvartalet, tack vare en stark "
+        "efterfrågan på sina tjänster. Forskare har upptäckt en ny grodart i regnskogen, som de tror kan "
+        "hjälpa dem att förstå hur klimatförändringarna påverkar djurlivet. Laget spelar sin sista match för "
+        "säsongen i helgen inför tusentals supportrar. Polisen utreder fortfarande vad som hände och ber "
+        "vittnen att höra av sig. Presidenten träffade världens ledare för att diskutera handel, säkerhet "
+        "och energi."
+    ),
+    'no': (
+        "Regjeringen kunngjorde tirsdag at den vil øke bevilgningene til offentlig helse og utdanning etter "
+        "flere måneder med press fra opposisjonspartiene. De ansvarlige sa at det nye budsjettet skal hjelpe "
+        "skoler og sykehus som har slitt med økende kostnader. Aksjene i teknologiselskaper falt kraftig "
+        "fordi investorene er bekymret for rentene og en lavere vekst. Selskapet la fram et høyere resultat "
+        "enn ventet for tredje kvartal, takket være en sterk etterspørsel etter tjenestene. Forskere har "
+        "oppdaget en ny froskeart i regnskogen, som de mener kan hjelpe dem å forstå hvordan "
+        "klimaendringene påvirker dyrelivet. Laget spiller sin siste kamp for sesongen denne helgen foran "
+        "tusenvis av tilskuere. Politiet etterforsker fortsatt hva som skjedde og ber vitner om å ta "
+        "kontakt. Presidenten møtte verdens ledere for å diskutere handel, sikkerhet og energi."
+    ),
+}
+
+_NON_LETTERS = re.compile(r"[^\w]+|[\d_]+")
+
+# (first, last) code points of scripts that identify a language on their own
+_SCRIPTS = (
+    (0x3040, 0x30FF, 'ja'),   # Hiragana and Katakana
+    (0xAC00, 0xD7AF, 'ko'),   # Hangul syllables
+    (0x1100, 0x11FF, 'ko'),   # Hangul jamo
+    (0x4E00, 0x9FFF, 'zh'),   # CJK ideographs (also used in Japanese)
+    (0x0400, 0x04FF, 'ru'),   # Cyrillic
+    (0x0600, 0x06FF, 'ar'),   # Arabic
+    (0x0590, 0x05FF, 'he'),   # Hebrew
+    (0x0370, 0x03FF, 'el'),   # Greek
+    (0x0900, 0x097F, 'hi'),   # Devanagari
+    (0x0E00, 0x0E7F, 'th'),   # Thai
+)
+_UKRAINIAN_LETTERS = set('іїєґ')
+
+
+def _words(text: str):
+    return _NON_LETTERS.sub(' ', text.lower()).split()
+
+
+def _trigrams(text: str) -> Counter:
+    grams = Counter()
+    for word in _words(text):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams[padded[i:i + 3]] += 1
+    return grams
+
+
+def _build_profiles() -> Dict[str, Dict[str, float]]:
+    counts = {lang: _trigrams(sample) for lang, sample in _SAMPLES.items()}
+    vocabulary = set()
+    for grams in counts.values():
+        vocabulary.update(grams)
+    profiles = {}
+    for lang, grams in counts.items():
+        denominator = sum(grams.values()) + len(vocabulary) + 1
+        profile = {gram: math.log((n + 1) / denominator) for gram, n in grams.items()}
+        # Log-probability of a trigram this language never produced
+        profile[None] = math.log(1 / denominator)
+        profiles[lang] = profile
+    return profiles
+
+
+_PROFILES = _build_profiles()
+
+
+def _script_language(text: str) -> Optional[str]:
+    """Language implied by the dominant non-Latin script, if any"""
+    letters = 0
+    by_language = Counter()
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        code = ord(char)
+        if code < 0x0370:
+            continue
+        for first, last, lang in _SCRIPTS:
+            if first <= code <= last:
+                by_language[lang] += 1
+                break
+    if not by_language or sum(by_language.values()) * 2 < letters:
+        return None
+    # Kana marks Japanese even though most of its characters are shared ideographs
+    if by_language['ja']:
+        return 'ja'
+    lang = by_language.most_common(1)[0][0]
+    if lang == 'ru' and _UKRAINIAN_LETTERS.intersection(text.lower()):
+        return 'uk'
+    return lang
+
+
+def detect_language(text: Optional[str], hint: Optional[str] = None) -> Optional[str]:
+    """ISO 639-1 code of `text`, or None when it is too short or ambiguous.
+
+    With `hint`, the language the text is expected to be in, another language is
+    only returned when it clearly outscores the hint; otherwise the result is None.
+    """
+    if not text:
+        return None
+    script_lang = _script_language(text)
+    if script_lang:
+        return script_lang
+    grams = _trigrams(text)
+    total = sum(grams.values())
+    if total < MIN_TRIGRAMS:
+        return None
+    scores = []
+    for lang, profile in _PROFILES.items():
+        unseen = profile[None]
+        score = sum(n * profile.get(gram, unseen) for gram, n in grams.items())
+        scores.append((score / total, lang))
+    scores.sort(reverse=True)
+    (best, lang), (runner_up, _) = scores[0], scores[1]
+    if best - runner_up < MIN_MARGIN:
+        return None
+    hint = hint.split('-')[0].lower() if hint else None
+    if hint in _PROFILES and lang != hint:
+        hinted = next(score for score, code in scores if code == hint)
+        if best - hinted < HINT_MARGIN:
+            return None
+    return lang
+
+
+def same_language(a: Optional[str], b: Optional[str]) -> bool:
+    """Compare codes ignoring region, e.g. 'zh' and 'zh-CN'"""
+    if not a or not b:
+        return False
+    return a.split('-')[0].lower() == b.split('-')[0].lower()
@@ -0,0 +1,194 @@
+"""
+Lightweight in-process metrics exposed in Prometheus text format.
+
+Each gunicorn/Flask worker keeps its own counters; scrape every worker (or
+run a single one) to get the full picture.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; tuned for a pipeline whose stages range from sub-millisecond
+# serialization up to multi-second Gemini calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labelvalues: Tuple) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(v) for v in labelvalues)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, *labelvalues, value: float) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labelvalues, value: float) -> None:
+        key = self._key(labelvalues)
+        # Non-cumulative bucket counts are kept on the hot path; the running
+        # totals Prometheus expects are only computed at scrape time.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the wall-clock duration of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*labelvalues, value=time.perf_counter() - start)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_latest() -> str:
+    """Render every registered metric in Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Application metrics
+STAGE_SECONDS = Histogram(
+    'newsdd_stage_duration_seconds',
+    'Time spent in each stage of the news pipeline.',
+    ('stage',)
+)
+REQUEST_SECONDS = Histogram(
+    'newsdd_request_duration_seconds',
+    'End-to-end request latency by endpoint.',
+    ('endpoint', 'method')
+)
+CACHE_REQUESTS = Counter(
+    'newsdd_cache_requests_total',
+    'Cache lookups by cache name and result (hit/miss).',
+    ('cache', 'result')
+)
+UPSTREAM_ERRORS = Counter(
+    'newsdd_upstream_errors_total',
+    'Errors returned by upstream services, by service and error type.',
+    ('upstream', 'error')
+)
+SUMMARIES = Counter(
+    'newsdd_summaries_total',
+    'Article summaries produced, by summarizer backend.',
+    ('backend',)
+)
+TRANSLATIONS = Counter(
+    'newsdd_translations_total',
+    'Strings sent to the translate backend or skipped because they were already in the target language.',
+    ('result',)
+)
+
+JOBS = Counter(
+    'newsdd_jobs_total',
+    'Background jobs submitted by this worker, by kind and outcome (enqueued, deduplicated, rejected).',
+    ('kind', 'outcome')
+)
+
+IN_FLIGHT = Gauge(
+    'newsdd_requests_in_flight',
+    'Requests currently being handled by this worker.'
+)
@@ -0,0 +1,101 @@
+"""
+Compact article model used between NewsService and the API layer.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class Article:
+    """One processed article; slotted so a page of them stays small in memory and cache"""
+
+    # Order is the row layout used by to_row()/from_row(); append new fields at the end
+    FIELDS = (
+        'url', 'title', 'description', 'urlToImage', 'publishedAt', 'source', 'content',
+        'originalLanguage', 'summary', 'translated_title', 'translatedDescription', 'translated_summary',
+        'summaryStatus'
+    )
+    __slots__ = FIELDS
+
+    # Fields that are only sent once they have been computed
+    OPTIONAL_FIELDS = frozenset((
+        'summary', 'translated_title', 'translatedDescription', 'translated_summary', 'summaryStatus'
+    ))
+
+    def __init__(self, url: str = '', title: str = '', description: str = '', urlToImage: Optional[str] = None,
+                 publishedAt: Optional[str] = None, source: str = 'Unknown', content: str = '',
+                 originalLanguage: str = 'en', summary: Optional[str] = None, translated_title: Optional[str] = None,
+                 translatedDescription: Optional[str] = None, translated_summary: Optional[str] = None,
+                 summaryStatus: Optional[str] = None):
+        self.url = url
+        self.title = title
+        self.description = description
+        self.urlToImage = urlToImage
+        self.publishedAt = publishedAt
+        self.source = source
+        self.content = content
+        self.originalLanguage = originalLanguage
+        self.summary = summary
+        self.translated_title = translated_title
+        self.translatedDescription = translatedDescription
+        self.translated_summary = translated_summary
+        # 'pending' while a background job is summarizing/translating, then 'ready' or 'failed'
+        self.summaryStatus = summaryStatus
+
+    @property
+    def id(self) -> str:
+        # Use URL as ID for now
+        return self.url
+
+    @classmethod
+    def from_newsapi(cls, raw: Dict) -> 'Article':
+        return cls(
+            url=raw.get('url', ''),
+            title=raw.get('title', ''),
+            description=raw.get('description', ''),
+            urlToImage=raw.get('urlToImage'),
+            publishedAt=raw.get('publishedAt'),
+            source=(raw.get('source') or {}).get('name', 'Unknown'),
+            content=raw.get('content', '')
+        )
+
+    def to_row(self) -> List:
+        return [getattr(self, name) for name in self.FIELDS]
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'Article':
+        # Rows written before a field was added are shorter; missing fields keep their defaults
+        return cls(**dict(zip(cls.FIELDS, row)))
+
+    def to_dict(self, fields: Optional[Tuple[str, ...]] = None) -> Dict:
+        """Response dict with every field, or only the projected ones"""
+        if fields is None:
+            fields = FULL_FIELDS
+        result = {}
+        for name in fields:
+            value = self.url if name == 'id' else getattr(self, name)
+            if value is None and name in self.OPTIONAL_FIELDS:
+                continue
+            result[name] = value
+        return result
+
+
+FULL_FIELDS = ('id',) + Article.FIELDS
+LITE_FIELDS = ('id', 'title', 'source', 'publishedAt', 'urlToImage', 'summary', 'translated_title', 'translated_summary',
+               'summaryStatus')
+
+
+def parse_fields(fields_param: Optional[str], lite: bool = False) -> Optional[Tuple[str, ...]]:
+    """Turn ?fields=a,b and ?lite=1 into a projection; None means every field.
+
+    Raises ValueError naming any unknown field, or when ?fields= names none.
+    """
+    if fields_param:
+        fields = tuple(dict.fromkeys(f.strip() for f in fields_param.split(',') if f.strip()))
+        if not fields:
+            raise ValueError(f"No fields given. Valid fields: {', '.join(FULL_FIELDS)}")
+        unknown = [f for f in fields if f not in FULL_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(FULL_FIELDS)}")
+        return fields
+    if lite:
+        return LITE_FIELDS
+    return None
@@ -1,7 +1,17 @@
 import requests
 import json
+import time
+import hashlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from metrics import STAGE_SECONDS, UPSTREAM_ERRORS, TRANSLATIONS
+from tracing import span
+from models import Article
+from language_id import detect_language, same_language
+from jobs import JobIncomplete
+from summarizers import GeminiSummarizer, SummarizerRouter, build_summarizers
 
 # Try to import Gemini AI
 try:
@@ -19,12 +29,38 @@ except ImportError:
     print("Warning: google-cloud-translate not installed. Translation will be disabled.")
     TRANSLATE_AVAILABLE = False
 
+# Article fields produced by enrich_article and carried in background job results
+ENRICHMENT_FIELDS = ('summary', 'translated_title', 'translatedDescription', 'translated_summary')
+
+
 class NewsService:
-    def __init__(self, news_api_key: str, gemini_api_key: str, google_translate_key: Optional[str] = None):
+    def __init__(self, news_api_key: str, gemini_api_key: str, google_translate_key: Optional[str] = None,
+                 news_api_base_url: str = "https://newsapi.org/v2",
+                 summarizer_backends: Optional[List[str]] = None,
+                 summary_budget_ms: Optional[float] = None,
+                 quota_cooldown_s: float = 60.0,
+                 cache=None,
+                 summary_cache_ttl: Optional[float] = None,
+                 max_workers: int = 8,
+                 image_url_rewriter=None):
         self.news_api_key = news_api_key
+        self.news_api_base_url = news_api_base_url.rstrip('/')
         self.gemini_api_key = gemini_api_key
         self.google_translate_key = google_translate_key
         
+        # Summarizers are tried in order; Gemini's model is attached below once configured
+        backends = build_summarizers(summarizer_backends or ['gemini', 'extractive'])
+        self.gemini_summarizer = next((b for b in backends if isinstance(b, GeminiSummarizer)), GeminiSummarizer())
+        self.summarizer = SummarizerRouter(backends, quota_cooldown_s=quota_cooldown_s)
+        # Total time per request that summarization may spend before slower backends are skipped
+        self.summary_budget_ms = summary_budget_ms
+        self.cache = cache
+        self.summary_cache_ttl = summary_cache_ttl
+        # Maps a publisher image URL to the URL clients should load (e.g. the image proxy)
+        self.image_url_rewriter = image_url_rewriter
+        # Shared pool for batch fan-out; sized so one batch cannot spawn unbounded threads
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news-fanout')
+        
         # Configure Gemini AI if available and API key provided
         self.gemini_model = None
         if GEMINI_AVAILABLE and gemini_api_key:
@@ -88,7 +124,7 @@ class NewsService:
     
     def fetch_news(self, query: str = None, category: str = None, language: str = 'en', page_size: int = 20) -> Dict:
         """Fetch news from News API"""
-        base_url = "https://newsapi.org/v2"
+        base_url = self.news_api_base_url
         
         if query:
             url = f"{base_url}/everything"
@@ -110,62 +146,49 @@ class NewsService:
                 params['category'] = category.lower()
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            with span('fetch_news', category=category or '', language=language), STAGE_SECONDS.time('fetch'):
+                response = requests.get(url, params=params)
+                response.raise_for_status()
+                return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching news: {e}")
+            UPSTREAM_ERRORS.inc('newsapi', type(e).__name__)
             return {"status": "error", "message": str(e)}
     
-    def summarize_article(self, title: str, description: str, content: str) -> str:
-        """Summarize an article using Gemini AI"""
-        if not self.gemini_model:
-            # Fallback: create a simple summary from available text
-            if description and len(description) > 50:
-                # Take first 100 characters and add ellipsis
-                return description[:100] + "..." if len(description) > 100 else description
-            elif title:
-                return f"Article about: {title}"
-            else:
-                return "Summary unavailable"
-        
-        try:
-            # Combine available text
-            article_text = f"Title: {title}\n"
-            if description:
-                article_text += f"Description: {description}\n"
-            if content and content != "[Removed]":
-                article_text += f"Content: {content}"
-            
-            prompt = f"""
-            Please provide a concise summary of this news article in 2-3 sentences:
-            
-            {article_text}
-            
-            Focus on the key facts and main points.
-            """
-            
-            response = self.gemini_model.generate_content(prompt)
-            return response.text.strip()
+    @property
+    def gemini_model(self):
+        return self.gemini_summarizer.model
+    
+    @gemini_model.setter
+    def gemini_model(self, model):
+        self.gemini_summarizer.model = model
+    
+    def summarize_article(self, title: str, description: str, content: str, budget_ms: Optional[float] = None,
+                          local_only: bool = False) -> str:
+        """Summarize an article with the first suitable summarizer backend"""
+        return self.summarize_with_backend(title, description, content, budget_ms, local_only)[0]
+    
+    def summarize_with_backend(self, title: str, description: str, content: str, budget_ms: Optional[float] = None,
+                               local_only: bool = False) -> Tuple[str, str]:
+        """(summary, backend name); the name is 'cache' for a model summary found in the cache"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = hashlib.sha1(f"{title}\x00{description}\x00{content}".encode('utf-8')).hexdigest()
+            found, summary = self.cache.get('summary', cache_key)
+            if found:
+                return summary, 'cache'
         
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                print(f"Rate limit/quota exceeded for Gemini API: {e}")
-                return f"AI summary temporarily unavailable (rate limit). Original description: {description}"
-            else:
-                print(f"Error summarizing article: {e}")
-            
-            # Fallback to simple summary
-            if description and len(description) > 50:
-                return description[:100] + "..." if len(description) > 100 else description
-            elif title:
-                return f"Article about: {title}"
-            else:
-                return "Summary unavailable"
+        summary, backend = self.summarizer.summarize(title, description, content, budget_ms=budget_ms,
+                                                     local_only=local_only)
+        # Only model summaries are worth sharing; local ones are cheaper to recompute than to
+        # cache, and caching them would mask the model summary once quota recovers
+        if cache_key and backend == 'gemini':
+            self.cache.set('summary', cache_key, summary, ttl=self.summary_cache_ttl)
+        return summary, backend
     
-    def translate_text(self, text: str, target_language: str = 'en') -> str:
-        """Translate text using Google Translate (if available)"""
+    def translate_text(self, text: str, target_language: str = 'en', source_language: Optional[str] = None,
+                       raise_errors: bool = False) -> str:
+        """Translate text using Google Translate (if available); on error the original text is returned"""
         if not self.translate_client:
             return text  # Return original text if translation not available
             
@@ -173,7 +196,9 @@ class NewsService:
             # Handle different client types
             if hasattr(self.translate_client, 'translate'):
                 # Old client
-                result = self.translate_client.translate(text, target_language=target_language)
+                with span('translate_text', target=target_language, chars=len(text or '')), STAGE_SECONDS.time('translate'):
+                    result = self.translate_client.translate(text, target_language=target_language,
+                                                             source_language=source_language)
                 return result['translatedText']
             else:
                 # New client - would need different implementation
@@ -181,56 +206,182 @@ class NewsService:
                 return text
         except Exception as e:
             print(f"Translation error: {e}")
+            UPSTREAM_ERRORS.inc('translate', type(e).__name__)
+            if raise_errors:
+                raise
             return text
     
-    def process_news_data(self, news_data: Dict, summarize: bool = True, translate_to: str = None) -> Dict:
-        """Process and enhance news data"""
+    def _translate_if_needed(self, text: Optional[str], target_language: str, fallback_language: Optional[str],
+                             problems: Optional[List[str]] = None) -> Optional[str]:
+        """Translation of `text`, or None when it is empty or already in the target language.
+        
+        With `problems`, a failed translation is recorded there and gives None
+        instead of the untranslated text.
+        """
+        if not text:
+            return None
+        with STAGE_SECONDS.time('detect_language'):
+            source_language = detect_language(text, hint=fallback_language) or fallback_language
+        if same_language(source_language, target_language):
+            TRANSLATIONS.inc('skipped')
+            return None
+        TRANSLATIONS.inc('translated')
+        if problems is None:
+            return self.translate_text(text, target_language, source_language)
+        try:
+            return self.translate_text(text, target_language, source_language, raise_errors=True)
+        except Exception as e:
+            problems.append(f"translation failed: {type(e).__name__}: {e}")
+            return None
+    
+    def _article_from_raw(self, raw_article: Dict) -> Article:
+        # originalLanguage defaults to English until detected in enrich_article
+        article = Article.from_newsapi(raw_article)
+        if self.image_url_rewriter and article.urlToImage:
+            article.urlToImage = self.image_url_rewriter(article.urlToImage)
+        return article
+    
+    def enrich_article(self, article: Article, summarize: bool = True, translate_to: str = None,
+                       deadline: Optional[float] = None, source_language: Optional[str] = None,
+                       local_only: bool = False, problems: Optional[List[str]] = None) -> Article:
+        """Summarize and translate one article in place.
+        
+        `source_language` is the language of the feed the article came from; it is
+        assumed for any text too short for detection to call. When `problems` is
+        given, fallbacks (a summary not from the preferred backend, a failed
+        translation) are recorded in it.
+        """
+        # Add summary if requested
+        if summarize and article.title:
+            budget_ms = None
+            if deadline is not None:
+                budget_ms = max(0.0, (deadline - time.perf_counter()) * 1000)
+            article.summary, backend = self.summarize_with_backend(
+                article.title,
+                article.description,
+                article.content,
+                budget_ms=budget_ms,
+                local_only=local_only
+            )
+            preferred = self.summarizer.preferred()
+            if problems is not None and backend not in ('cache', preferred):
+                problems.append(f"summary from {backend} instead of {preferred}")
+        
+        # Record the article's real language; title and description together are a
+        # better sample than either alone, and the fallback for strings too short to call.
+        # The feed's language is assumed unless the text clearly says otherwise
+        with STAGE_SECONDS.time('detect_language'):
+            sample = f"{article.title or ''}. {article.description or ''}"
+            detected = detect_language(sample, hint=source_language) or source_language
+        if detected:
+            article.originalLanguage = detected
+        
+        # Translate only the strings that are not already in the target language
+        if translate_to and self.translate_client:
+            article.translated_title = self._translate_if_needed(article.title, translate_to, detected, problems)
+            article.translatedDescription = self._translate_if_needed(article.description, translate_to, detected,
+                                                                      problems)
+            article.translated_summary = self._translate_if_needed(article.summary, translate_to, detected, problems)
+        return article
+    
+    def enrichment_key(self, article: Article, translate_to: Optional[str],
+                       source_language: Optional[str] = None) -> str:
+        """Content hash identifying the summarize/translate work for one article"""
+        text = (f"{article.title}\x00{article.description}\x00{article.content}\x00{translate_to or ''}"
+                f"\x00{source_language or ''}")
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def enrichment_payload(self, article: Article, translate_to: Optional[str],
+                           source_language: Optional[str] = None) -> Dict:
+        return {
+            'title': article.title,
+            'description': article.description,
+            'content': article.content,
+            'translateTo': translate_to,
+            'sourceLanguage': source_language
+        }
+    
+    def run_enrichment_job(self, payload: Dict) -> Dict:
+        """Background job: summarize and translate one article with no request deadline.
+        
+        Raises JobIncomplete, carrying the fallback result, when the model was
+        unavailable or a translation failed, so the queue retries it later.
+        """
+        article = Article(title=payload['title'], description=payload['description'], content=payload['content'])
+        problems = []
+        self.enrich_article(article, summarize=True, translate_to=payload.get('translateTo'),
+                            source_language=payload.get('sourceLanguage'), problems=problems)
+        result = {name: getattr(article, name) for name in ENRICHMENT_FIELDS}
+        if problems:
+            raise JobIncomplete('; '.join(problems), result)
+        return result
+    
+    @staticmethod
+    def apply_enrichment(article: Article, result: Dict) -> Article:
+        for name in ENRICHMENT_FIELDS:
+            setattr(article, name, result.get(name))
+        article.summaryStatus = 'ready'
+        return article
+    
+    def _summary_deadline(self) -> Optional[float]:
+        if self.summary_budget_ms is None:
+            return None
+        return time.perf_counter() + self.summary_budget_ms / 1000.0
+    
+    def process_news_data(self, news_data: Dict, summarize: bool = True, translate_to: str = None,
+                          source_language: Optional[str] = None) -> Dict:
+        """Process and enhance news data; articles are returned as Article objects"""
         if news_data.get('status') == 'error':
             return news_data
         
-        articles = news_data.get('articles', [])
+        deadline = self._summary_deadline()
         processed_articles = []
-        
-        for article in articles:
-            processed_article = {
-                'id': article.get('url', ''),  # Use URL as ID for now
-                'title': article.get('title', ''),
-                'description': article.get('description', ''),
-                'url': article.get('url', ''),
-                'urlToImage': article.get('urlToImage'),
-                'publishedAt': article.get('publishedAt'),
-                'source': article.get('source', {}).get('name', 'Unknown'),
-                'content': article.get('content', ''),
-                'originalLanguage': 'en'  # Default to English, will be updated if translation is applied
-            }
-            
-            # Add summary if requested
-            if summarize and processed_article['title']:
-                processed_article['summary'] = self.summarize_article(
-                    processed_article['title'],
-                    processed_article['description'],
-                    processed_article['content']
-                )
-            
-            # Add translation if requested and available
-            if translate_to and self.translate_client and translate_to != 'en':
-                processed_article['translated_title'] = self.translate_text(
-                    processed_article['title'], translate_to
-                )
-                processed_article['translatedDescription'] = self.translate_text(
-                    processed_article['description'], translate_to
-                )
-                if processed_article.get('summary'):
-                    processed_article['translated_summary'] = self.translate_text(
-                        processed_article['summary'], translate_to
-                    )
-                # Mark that this article was translated from English
-                processed_article['originalLanguage'] = 'en'
-            
-            processed_articles.append(processed_article)
+        for raw_article in news_data.get('articles', []):
+            article = self._article_from_raw(raw_article)
+            processed_articles.append(self.enrich_article(article, summarize, translate_to, deadline, source_language))
         
         return {
             'status': 'ok',
             'totalResults': news_data.get('totalResults', len(processed_articles)),
             'articles': processed_articles
-        }
\ No newline at end of file
+        }
+    
+    def _submit(self, fn, *args):
+        # Run in a copy of the caller's context so request tracing follows the work
+        return self.executor.submit(contextvars.copy_context().run, fn, *args)
+    
+    def fetch_and_process_many(self, categories: List[str], language: str = 'en', summarize: bool = True,
+                               translate_to: str = None, page_size: int = 20) -> Dict[str, Dict]:
+        """Fetch several categories concurrently and enrich each distinct article once.
+        
+        Returns {category: {'totalResults', 'articles': [Article]}} or {category: {'error': message}};
+        an article that appears in several categories is the same Article object in each list.
+        """
+        fetches = {c: self._submit(self.fetch_news, None, c, language, page_size) for c in categories}
+        
+        results = {}
+        unique = {}
+        for category, future in fetches.items():
+            news_data = future.result()
+            if not news_data or news_data.get('status') == 'error':
+                results[category] = {'error': (news_data or {}).get('message', 'No articles found')}
+                continue
+            articles = []
+            for raw_article in news_data.get('articles', []):
+                # Articles without a URL cannot be matched across categories
+                key = raw_article.get('url') or id(raw_article)
+                article = unique.get(key)
+                if article is None:
+                    article = unique[key] = self._article_from_raw(raw_article)
+                articles.append(article)
+            results[category] = {
+                'totalResults': news_data.get('totalResults', len(articles)),
+                'articles': articles
+            }
+        
+        deadline = self._summary_deadline()
+        enrichments = [self._submit(self.enrich_article, a, summarize, translate_to, deadline, language)
+                       for a in unique.values()]
+        for future in enrichments:
+            future.result()
+        return results
@@ -0,0 +1,111 @@
+"""
+Personalized feed ranking over the shared category pools.
+
+Each cached category page is scored for a user in one vectorized pass
+(category preference, preferred sources, recency, position in the pool, and
+muted keywords). Scores are cached per (user preferences revision, pool
+build), so a preference change or a refreshed pool only rescores what
+changed.
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models import Article
+
+# Try to import NumPy for vectorized scoring
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    print("Warning: numpy not installed. Personalized feeds will use unranked pool order.")
+    NUMPY_AVAILABLE = False
+
+SOURCE_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_HOURS = 12.0
+POSITION_WEIGHT = 0.25
+
+
+def _published_ts(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def score_pool(articles: List[Article], category_weight: float, preferences: Dict,
+               now: Optional[float] = None) -> List[Tuple[str, float]]:
+    """(article id, score) for every article in one pool that is not muted"""
+    if not articles:
+        return []
+    now = now or time.time()
+    muted = preferences.get('mutedKeywords') or []
+
+    if not NUMPY_AVAILABLE:
+        scored = []
+        for article in articles:
+            text = f"{article.title or ''} {article.description or ''}".lower()
+            if not any(keyword in text for keyword in muted):
+                scored.append((article.id, category_weight))
+        return scored
+
+    n = len(articles)
+    sources = {s.lower() for s in preferences.get('preferredSources') or []}
+    source_match = np.fromiter(((a.source or '').lower() in sources for a in articles), dtype=bool, count=n)
+    published = np.fromiter((_published_ts(a.publishedAt) for a in articles), dtype=float, count=n)
+    age_hours = np.clip((now - published) / 3600.0, 0.0, None)
+    recency = np.where(published > 0, np.exp2(-age_hours / RECENCY_HALF_LIFE_HOURS), 0.0)
+    position = 1.0 - np.arange(n) / n
+
+    scores = (category_weight
+              + SOURCE_WEIGHT * source_match
+              + RECENCY_WEIGHT * recency
+              + POSITION_WEIGHT * position)
+
+    if muted:
+        texts = np.array([f"{a.title or ''} {a.description or ''}".lower() for a in articles])
+        keep = np.ones(n, dtype=bool)
+        for keyword in muted:
+            keep &= np.char.find(texts, keyword) < 0
+    else:
+        keep = np.ones(n, dtype=bool)
+
+    return [(articles[i].id, float(scores[i])) for i in np.flatnonzero(keep)]
+
+
+def category_weight(preferences: Dict, category: str) -> float:
+    """1.0 for the first preferred category, decreasing for later ones"""
+    categories = preferences.get('preferredCategories') or []
+    if category not in categories:
+        return 0.0
+    return 1.0 - categories.index(category) / len(categories)
+
+
+class FeedRanker:
+    def __init__(self, cache, ttl: float = 300):
+        self.cache = cache
+        self.ttl = ttl
+
+    def rank(self, user_id: str, preferences: Dict, pools: Dict[str, Dict], limit: int) -> List[Article]:
+        """Merge the scored pools into one feed; an article in several pools keeps its best score"""
+        revision = preferences.get('updatedAt', 0)
+        best: Dict[str, float] = {}
+        by_id: Dict[str, Article] = {}
+        for category, pool in pools.items():
+            if 'error' in pool:
+                continue
+            key = f"{user_id}:{revision}:{category}:{pool['builtAt']}"
+            found, scored = self.cache.get('feed_scores', key)
+            if not found:
+                scored = score_pool(pool['articles'], category_weight(preferences, category), preferences)
+                self.cache.set('feed_scores', key, scored, ttl=self.ttl)
+            for article in pool['articles']:
+                by_id.setdefault(article.id, article)
+            for article_id, score in scored:
+                if score > best.get(article_id, float('-inf')):
+                    best[article_id] = score
+        ranked = sorted(best, key=best.get, reverse=True)[:limit]
+        return [by_id[article_id] for article_id in ranked]
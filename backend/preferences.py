@@ -0,0 +1,78 @@
+"""
+Per-user preference storage.
+"""
+import json
+import time
+from typing import Dict, Optional
+
+from sqlite_db import ThreadLocalSQLite
+
+MAX_LIST_ITEMS = 50
+
+DEFAULT_PREFERENCES = {
+    'preferredCategories': ['general'],
+    'preferredSources': [],
+    'language': 'en',
+    'mutedKeywords': []
+}
+
+
+def _string_list(value, name: str, lower: bool = False):
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{name} must be a list of strings")
+    cleaned = [v.strip().lower() if lower else v.strip() for v in value if v and v.strip()]
+    return list(dict.fromkeys(cleaned))[:MAX_LIST_ITEMS]
+
+
+def normalize_preferences(data: Dict) -> Dict:
+    """Validate a preferences payload, filling in defaults; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError('Preferences must be a JSON object')
+    language = data.get('language', DEFAULT_PREFERENCES['language'])
+    if not isinstance(language, str) or not language.strip():
+        raise ValueError('language must be a language code')
+    return {
+        # The dashboard's onboarding flow calls these 'categories'
+        'preferredCategories': _string_list(data.get('preferredCategories', data.get('categories')),
+                                            'preferredCategories', lower=True)
+                               or list(DEFAULT_PREFERENCES['preferredCategories']),
+        'preferredSources': _string_list(data.get('preferredSources'), 'preferredSources'),
+        'language': language.strip().lower(),
+        'mutedKeywords': _string_list(data.get('mutedKeywords'), 'mutedKeywords', lower=True)
+    }
+
+
+class PreferencesStore:
+    """SQLite-backed preferences keyed by user ID, shared by all workers on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = ThreadLocalSQLite(path, [
+            'CREATE TABLE IF NOT EXISTS preferences ('
+            'user_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)'
+        ])
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        """Stored preferences with their 'updatedAt' revision, or None"""
+        row = self._db.conn().execute(
+            'SELECT data, updated_at FROM preferences WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        preferences = json.loads(row[0])
+        preferences['updatedAt'] = row[1]
+        return preferences
+
+    def save(self, user_id: str, preferences: Dict) -> Dict:
+        updated_at = time.time()
+        data = {k: v for k, v in preferences.items() if k != 'updatedAt'}
+        conn = self._db.conn()
+        conn.execute(
+            'INSERT INTO preferences (user_id, data, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at',
+            (user_id, json.dumps(data), updated_at)
+        )
+        conn.commit()
+        return dict(data, updatedAt=updated_at)
@@ -0,0 +1,128 @@
+"""
+Pre-rendered link previews for shared articles.
+
+Crawlers and chat-app unfurlers only need the Open Graph tags, not the SPA or
+the article JSON. Each share's preview page is rendered once, gzip-compressed,
+and kept in a per-process LRU backed by files on disk, so a burst of bot
+requests is answered from memory without touching the share store.
+"""
+import gzip
+import html
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from cache import MemoryLRU
+from metrics import CACHE_REQUESTS
+
+SITE_NAME = 'News Digest'
+MAX_DESCRIPTION_CHARS = 300
+
+BOT_USER_AGENT = re.compile(
+    r'bot|crawler|spider|facebookexternalhit|facebookcatalog|embedly|slack|discord|whatsapp|telegram|'
+    r'skypeuripreview|linkedin|pinterest|vkshare|redditbot|applebot|quora link preview|iframely|preview',
+    re.IGNORECASE
+)
+SHARE_ID = re.compile(r'^[0-9a-f]{12}$')
+
+
+def is_bot(user_agent: Optional[str]) -> bool:
+    return bool(user_agent and BOT_USER_AGENT.search(user_agent))
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rsplit(' ', 1)[0] + '…'
+
+
+def _e(value) -> str:
+    # Shared articles are posted by clients, so values may be any JSON type
+    return html.escape('' if value is None else str(value), quote=True)
+
+
+def render_preview(article: Dict, share_url: str, app_url: str) -> str:
+    """Minimal HTML page carrying Open Graph and Twitter card tags for one article"""
+    title = article.get('translated_title') or article.get('title') or SITE_NAME
+    description = _truncate(str(
+        article.get('translated_summary') or article.get('summary')
+        or article.get('translatedDescription') or article.get('description') or ''
+    ), MAX_DESCRIPTION_CHARS)
+    image = article.get('urlToImage')
+    source = article.get('source')
+    if isinstance(source, dict):
+        source = source.get('name')
+
+    tags = [
+        ('og:type', 'article'),
+        ('og:site_name', SITE_NAME),
+        ('og:title', title),
+        ('og:description', description),
+        ('og:url', share_url),
+        ('twitter:card', 'summary_large_image' if image else 'summary'),
+        ('twitter:title', title),
+        ('twitter:description', description),
+    ]
+    if image:
+        tags += [('og:image', image), ('twitter:image', image)]
+    meta = '\n'.join(
+        f'<meta {"name" if name.startswith("twitter:") else "property"}="{name}" content="{_e(value)}">'
+        for name, value in tags
+    )
+    byline = f'<p>{_e(source)}</p>' if source else ''
+    return (
+        '<!DOCTYPE html>\n'
+        '<html lang="en">\n<head>\n'
+        '<meta charset="utf-8">\n'
+        f'<title>{_e(title)} | {SITE_NAME}</title>\n'
+        f'<meta name="description" content="{_e(description)}">\n'
+        f'<link rel="canonical" href="{_e(app_url)}">\n'
+        f'{meta}\n'
+        '</head>\n<body>\n'
+        f'<h1>{_e(title)}</h1>\n{byline}\n<p>{_e(description)}</p>\n'
+        f'<p><a href="{_e(app_url)}">Read on {SITE_NAME}</a></p>\n'
+        '</body>\n</html>\n'
+    )
+
+
+class PreviewCache:
+    """Gzipped preview pages: per-process LRU in front of one file per share"""
+
+    def __init__(self, directory: str, memory_entries: int = 1024):
+        self.directory = directory
+        self.memory = MemoryLRU(memory_entries)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, share_id: str) -> str:
+        if not SHARE_ID.match(share_id):
+            raise ValueError(f"Invalid share ID: {share_id!r}")
+        return os.path.join(self.directory, f"{share_id}.html.gz")
+
+    def get(self, share_id: str) -> Optional[bytes]:
+        found, body = self.memory.get(share_id)
+        if found:
+            CACHE_REQUESTS.inc('share_preview', 'hit_l1')
+            return body
+        try:
+            with open(self._path(share_id), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            CACHE_REQUESTS.inc('share_preview', 'miss')
+            return None
+        CACHE_REQUESTS.inc('share_preview', 'hit_l2')
+        self.memory.set(share_id, body, 0)
+        return body
+
+    def put(self, share_id: str, page: str) -> bytes:
+        """Compress and store a rendered page; returns the gzipped bytes"""
+        path = self._path(share_id)
+        body = gzip.compress(page.encode('utf-8'), compresslevel=9)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        self.memory.set(share_id, body, 0)
+        return body
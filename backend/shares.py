@@ -0,0 +1,40 @@
+"""
+Shared article links.
+"""
+import json
+from typing import Dict, Optional
+
+from sqlite_db import ThreadLocalSQLite
+
+
+class ShareStore:
+    """SQLite-backed share links, visible to every worker process on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = ThreadLocalSQLite(path, [
+            'CREATE TABLE IF NOT EXISTS shares ('
+            'share_id TEXT PRIMARY KEY, article TEXT NOT NULL, created_at TEXT NOT NULL, '
+            'views INTEGER NOT NULL DEFAULT 0)'
+        ])
+
+    def add(self, share_id: str, article: Dict, created_at: str) -> None:
+        conn = self._db.conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO shares (share_id, article, created_at, views) VALUES (?, ?, ?, 0)',
+            (share_id, json.dumps(article), created_at)
+        )
+        conn.commit()
+
+    def get(self, share_id: str, count_view: bool = False) -> Optional[Dict]:
+        """The share record ({'article', 'created_at', 'views'}), or None"""
+        conn = self._db.conn()
+        if count_view:
+            conn.execute('UPDATE shares SET views = views + 1 WHERE share_id = ?', (share_id,))
+            conn.commit()
+        row = conn.execute(
+            'SELECT article, created_at, views FROM shares WHERE share_id = ?', (share_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'article': json.loads(row[0]), 'created_at': row[1], 'views': row[2]}
@@ -0,0 +1,43 @@
+"""
+Per-thread SQLite connections shared by the backend's on-disk stores.
+
+Users, shares, preferences, the L2 cache, the thumbnail index and the job
+queue each live in a WAL-mode SQLite file that every gunicorn worker opens.
+SQLite connections cannot be shared between threads or carried across fork,
+so each thread of each process gets its own.
+"""
+import os
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+
+class ThreadLocalSQLite:
+    """Opens `path` lazily, once per thread and process, after creating its schema"""
+
+    def __init__(self, path: str, schema: Iterable[str] = (), timeout: float = 5, autocommit: bool = False,
+                 synchronous: Optional[str] = None):
+        self.path = path
+        self.timeout = timeout
+        self.autocommit = autocommit
+        self.synchronous = synchronous
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self.conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        for statement in schema:
+            conn.execute(statement)
+        conn.commit()
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # Never reuse a connection inherited across fork (e.g. from a preloaded gunicorn master)
+        if conn is None or self._local.pid != os.getpid():
+            # Autocommit leaves transactions to the caller (BEGIN IMMEDIATE ... COMMIT)
+            conn = sqlite3.connect(self.path, timeout=self.timeout,
+                                   isolation_level=None if self.autocommit else '')
+            if self.synchronous:
+                conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,295 @@
+"""
+Summarizer backends and the routing policy that picks between them.
+
+GeminiSummarizer calls the remote model; ExtractiveSummarizer ranks the
+article's own sentences locally (TF-IDF vectors + TextRank) in a few
+milliseconds. SummarizerRouter tries backends in order, skipping any that is
+cooling down after a quota error or, for remote backends, whose recent latency
+would blow the caller's budget. A remote backend skipped for latency is still
+tried now and then, so one slow call cannot switch it off for good.
+"""
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from metrics import STAGE_SECONDS, UPSTREAM_ERRORS, SUMMARIES
+from tracing import span
+
+# Try to import NumPy for the local extractive summarizer
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    print("Warning: numpy not installed. Local extractive summarization will be disabled.")
+    NUMPY_AVAILABLE = False
+
+
+class SummarizerError(Exception):
+    """A backend could not produce a summary"""
+
+
+class SummarizerRateLimited(SummarizerError):
+    """A backend hit its rate limit or quota"""
+
+
+def simple_summary(title: str, description: str) -> str:
+    """Last-resort summary used when no backend is available"""
+    if description and len(description) > 50:
+        # Take first 100 characters and add ellipsis
+        return description[:100] + "..." if len(description) > 100 else description
+    elif title:
+        return f"Article about: {title}"
+    else:
+        return "Summary unavailable"
+
+
+class Summarizer:
+    name = 'base'
+    # Backends that call a remote service; skipped when the caller asks for local work only
+    remote = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Exponentially weighted moving average of observed latency, in ms
+        self.latency_ms: Optional[float] = None
+        self.cooldown_until = 0.0
+        # When the router last let a call through despite the latency estimate
+        self.last_probe = 0.0
+
+    def available(self) -> bool:
+        return True
+
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def start_cooldown(self, seconds: float) -> None:
+        self.cooldown_until = time.monotonic() + seconds
+
+    def claim_probe(self, interval_s: float) -> bool:
+        """True for at most one caller per interval; used to re-measure a backend that is being skipped"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self.last_probe < interval_s:
+                return False
+            self.last_probe = now
+            return True
+
+    def record_latency(self, elapsed_ms: float, alpha: float = 0.2) -> None:
+        with self._lock:
+            if self.latency_ms is None:
+                self.latency_ms = elapsed_ms
+            else:
+                self.latency_ms = alpha * elapsed_ms + (1 - alpha) * self.latency_ms
+
+    def summarize(self, title: str, description: str, content: str) -> str:
+        raise NotImplementedError
+
+
+class GeminiSummarizer(Summarizer):
+    name = 'gemini'
+    remote = True
+
+    def __init__(self, model=None):
+        super().__init__()
+        self.model = model
+
+    def available(self) -> bool:
+        return self.model is not None
+
+    def summarize(self, title: str, description: str, content: str) -> str:
+        # Combine available text
+        article_text = f"Title: {title}\n"
+        if description:
+            article_text += f"Description: {description}\n"
+        if content and content != "[Removed]":
+            article_text += f"Content: {content}"
+
+        prompt = f"""
+        Please provide a concise summary of this news article in 2-3 sentences:
+
+        {article_text}
+
+        Focus on the key facts and main points.
+        """
+
+        try:
+            with span('summarize_article', promptChars=len(prompt)), STAGE_SECONDS.time('summarize'):
+                response = self.model.generate_content(prompt)
+            return response.text.strip()
+        except Exception as e:
+            error_msg = str(e)
+            if "429" in error_msg or "quota" in error_msg.lower() or "rate" in error_msg.lower():
+                print(f"Rate limit/quota exceeded for Gemini API: {e}")
+                UPSTREAM_ERRORS.inc('gemini', 'rate_limit')
+                raise SummarizerRateLimited(error_msg) from e
+            print(f"Error summarizing article: {e}")
+            UPSTREAM_ERRORS.inc('gemini', type(e).__name__)
+            raise SummarizerError(error_msg) from e
+
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'“])')
+_TRUNCATION_MARKER = re.compile(r'\s*(…|\.\.\.)?\s*\[\+\d+ chars\]\s*$')
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9'’-]*")
+_STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i in is it its of on or our she that the
+their them they this to was we were will with would you your after before over about into than then there
+said says also more most new not no so up out what when which who how all can could may might one two
+""".split())
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+class ExtractiveSummarizer(Summarizer):
+    name = 'extractive'
+
+    def __init__(self, max_sentences: int = 2, damping: float = 0.85, iterations: int = 30):
+        super().__init__()
+        self.max_sentences = max_sentences
+        self.damping = damping
+        self.iterations = iterations
+
+    def available(self) -> bool:
+        return NUMPY_AVAILABLE
+
+    def _sentences(self, description: str, content: str) -> List[str]:
+        text = description or ''
+        if content and content != "[Removed]":
+            text += ' ' + _TRUNCATION_MARKER.sub('', content)
+        seen = set()
+        sentences = []
+        for sentence in _SENTENCE_SPLIT.split(text.strip()):
+            sentence = sentence.strip()
+            key = sentence.lower()
+            # NewsAPI content usually repeats the description; keep each sentence once
+            if len(sentence) < 20 or key in seen:
+                continue
+            seen.add(key)
+            sentences.append(sentence)
+        return sentences
+
+    def rank(self, title: str, sentences: List[str]) -> 'np.ndarray':
+        """Score sentences with TextRank over TF-IDF vectors, biased toward the title and lead"""
+        n = len(sentences)
+        vocabulary = {}
+        rows, cols = [], []
+        for i, sentence in enumerate(sentences):
+            for token in _tokens(sentence):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        if not vocabulary:
+            return np.zeros(n)
+
+        tf = np.zeros((n, len(vocabulary)))
+        np.add.at(tf, (np.array(rows), np.array(cols)), 1.0)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        vectors = tf * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        # Sentences sharing no terms with any other jump uniformly
+        transition = np.where(row_sums > 0, similarity / np.where(row_sums == 0, 1.0, row_sums), 1.0 / n)
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+        scores /= scores.max() or 1.0
+
+        title_ids = [vocabulary[t] for t in _tokens(title or '') if t in vocabulary]
+        if title_ids:
+            title_vector = np.zeros(len(vocabulary))
+            np.add.at(title_vector, np.array(title_ids), 1.0)
+            title_vector *= idf
+            title_vector /= np.linalg.norm(title_vector)
+            scores += 0.5 * (vectors @ title_vector)
+        # News is written lead-first
+        scores += 0.1 * (1.0 - np.arange(n) / n)
+        return scores
+
+    def summarize(self, title: str, description: str, content: str) -> str:
+        with span('summarize_extractive'), STAGE_SECONDS.time('summarize_local'):
+            sentences = self._sentences(description, content)
+            if not sentences:
+                raise SummarizerError('No usable sentences')
+            if len(sentences) <= self.max_sentences:
+                return ' '.join(sentences)
+            scores = self.rank(title, sentences)
+            chosen = sorted(np.argsort(-scores, kind='stable')[:self.max_sentences])
+            return ' '.join(sentences[i] for i in chosen)
+
+
+class SummarizerRouter:
+    """Pick a summarizer per article based on latency budget and quota state"""
+
+    def __init__(self, backends: List[Summarizer], quota_cooldown_s: float = 60.0, probe_interval_s: float = 30.0):
+        self.backends = backends
+        self.quota_cooldown_s = quota_cooldown_s
+        self.probe_interval_s = probe_interval_s
+
+    def preferred(self) -> str:
+        """Name of the backend summaries should come from when nothing is failing"""
+        for backend in self.backends:
+            if backend.available():
+                return backend.name
+        return 'simple'
+
+    def _over_budget(self, backend: Summarizer, budget_ms: Optional[float]) -> bool:
+        # Local backends take milliseconds and always beat the simple fallback, so the
+        # budget only gates remote ones
+        if budget_ms is None or not backend.remote or backend.latency_ms is None:
+            return False
+        if backend.latency_ms <= budget_ms:
+            return False
+        # Let an occasional call through so the estimate can recover once the backend is fast again
+        return not backend.claim_probe(self.probe_interval_s)
+
+    def summarize(self, title: str, description: str, content: str,
+                  budget_ms: Optional[float] = None, local_only: bool = False) -> Tuple[str, str]:
+        """Return (summary, backend name); falls back to a simple summary"""
+        for backend in self.backends:
+            if not backend.available() or backend.cooling_down():
+                continue
+            if local_only and backend.remote:
+                continue
+            if self._over_budget(backend, budget_ms):
+                continue
+            start = time.perf_counter()
+            try:
+                summary = backend.summarize(title, description, content)
+            except SummarizerRateLimited:
+                backend.start_cooldown(self.quota_cooldown_s)
+                continue
+            except SummarizerError:
+                continue
+            finally:
+                backend.record_latency((time.perf_counter() - start) * 1000)
+            SUMMARIES.inc(backend.name)
+            return summary, backend.name
+        SUMMARIES.inc('simple')
+        return simple_summary(title, description), 'simple'
+
+
+def build_summarizers(names: List[str], gemini_model=None, max_sentences: int = 2) -> List[Summarizer]:
+    """Instantiate backends by name, in routing order"""
+    factories = {
+        'gemini': lambda: GeminiSummarizer(gemini_model),
+        'extractive': lambda: ExtractiveSummarizer(max_sentences=max_sentences)
+    }
+    backends = []
+    for name in names:
+        name = name.strip().lower()
+        if name not in factories:
+            print(f"⚠ Unknown summarizer backend '{name}' ignored")
+            continue
+        backends.append(factories[name]())
+    return backends
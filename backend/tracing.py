@@ -0,0 +1,163 @@
+"""
+Lightweight request tracing with tail-biased sampling.
+
+Every request gets a trace; spans are recorded cheaply in memory and the
+keep/drop decision is made when the request finishes, so slow and failed
+requests are always kept while the rest are sampled. Kept traces go to a
+bounded ring buffer and, optionally, a size-capped JSONL file.
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_current_trace = contextvars.ContextVar('newsdd_trace', default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Trace:
+    __slots__ = ('request_id', 'name', 'started_at', 'start', 'spans', 'dropped_spans', 'attrs')
+
+    def __init__(self, request_id: str, name: str):
+        self.request_id = request_id
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.dropped_spans = 0
+        self.attrs: Dict = {}
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.05, slow_threshold_ms: float = 2000,
+                 buffer_size: int = 200, max_spans: int = 256,
+                 export_path: Optional[str] = None, export_max_bytes: int = 10 * 1024 * 1024):
+        self._lock = threading.Lock()
+        self.configure(sample_rate, slow_threshold_ms, buffer_size, max_spans, export_path, export_max_bytes)
+
+    def configure(self, sample_rate: float = 0.05, slow_threshold_ms: float = 2000,
+                  buffer_size: int = 200, max_spans: int = 256,
+                  export_path: Optional[str] = None, export_max_bytes: int = 10 * 1024 * 1024):
+        """(Re)configure sampling and export; clears the ring buffer"""
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        # Spans beyond this are counted but not stored, bounding per-request memory
+        self.max_spans = max_spans
+        self.export_path = export_path
+        self.export_max_bytes = export_max_bytes
+        with self._lock:
+            self.buffer = deque(maxlen=buffer_size)
+
+    def start_trace(self, request_id: str, name: str) -> Trace:
+        trace = Trace(request_id, name)
+        _current_trace.set(trace)
+        return trace
+
+    def current_trace(self) -> Optional[Trace]:
+        return _current_trace.get()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Record a span in the current trace; a no-op outside a traced request"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if len(trace.spans) < self.max_spans:
+                end = time.perf_counter()
+                record = {
+                    'name': name,
+                    'startMs': round((start - trace.start) * 1000, 3),
+                    'durationMs': round((end - start) * 1000, 3),
+                    'thread': threading.get_ident()
+                }
+                if attrs:
+                    record['attrs'] = attrs
+                if error:
+                    record['error'] = error
+                trace.spans.append(record)
+            else:
+                trace.dropped_spans += 1
+
+    def finish_trace(self, status_code: Optional[int] = None, error: Optional[BaseException] = None) -> Optional[Dict]:
+        """Close the current trace and keep it if it is slow, failed or sampled"""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        _current_trace.set(None)
+
+        duration_ms = (time.perf_counter() - trace.start) * 1000
+        failed = error is not None or (status_code is not None and status_code >= 500)
+        if duration_ms >= self.slow_threshold_ms:
+            reason = 'slow'
+        elif failed:
+            reason = 'error'
+        elif random.random() < self.sample_rate:
+            reason = 'sampled'
+        else:
+            return None
+
+        record = {
+            'requestId': trace.request_id,
+            'name': trace.name,
+            'startedAt': trace.started_at,
+            'durationMs': round(duration_ms, 3),
+            'status': status_code,
+            'keptBecause': reason,
+            'spans': trace.spans,
+            'droppedSpans': trace.dropped_spans,
+            'attrs': trace.attrs
+        }
+        if error is not None:
+            record['error'] = type(error).__name__
+        with self._lock:
+            self.buffer.append(record)
+        if self.export_path:
+            self._export(record)
+        return record
+
+    def _export(self, record: Dict) -> None:
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        try:
+            with self._lock:
+                if os.path.exists(self.export_path) and os.path.getsize(self.export_path) > self.export_max_bytes:
+                    os.replace(self.export_path, self.export_path + '.1')
+                with open(self.export_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"Trace export error: {e}")
+
+    def recent(self, limit: int = 50, min_duration_ms: float = 0) -> List[Dict]:
+        """Most recent kept traces, newest first"""
+        with self._lock:
+            traces = list(self.buffer)
+        traces.reverse()
+        return [t for t in traces if t['durationMs'] >= min_duration_ms][:limit]
+
+    def get(self, request_id: str) -> Optional[Dict]:
+        with self._lock:
+            for trace in self.buffer:
+                if trace['requestId'] == request_id:
+                    return trace
+        return None
+
+
+tracer = Tracer()
+span = tracer.span
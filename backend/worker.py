@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Background workers for summarize/translate jobs.
+
+    python worker.py --processes 2
+
+Runs a small supervisor that keeps `--processes` worker processes alive, each
+claiming jobs from the SQLite queue at JOB_QUEUE_PATH. gunicorn.conf.py and
+`python app.py` start it automatically when ENRICHMENT_MODE is 'async'.
+SIGTERM/SIGINT let every worker finish its current job before exiting.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+
+from config import Config
+from jobs import JobQueue, run_worker
+
+PRUNE_INTERVAL_S = 600
+
+
+def _work(stop) -> None:
+    # Imported here so the supervisor stays light; each worker gets its own
+    # NewsService, cache and queue connections
+    from app import job_queue, news_service
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    run_worker(job_queue, {'enrich': news_service.run_enrichment_job}, stop)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run background summarize/translate workers')
+    parser.add_argument('--processes', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    ctx = multiprocessing.get_context('spawn')
+    stop = ctx.Event()
+    shutdown = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: shutdown.set())
+    signal.signal(signal.SIGINT, lambda *_: shutdown.set())
+
+    def start():
+        process = ctx.Process(target=_work, args=(stop,), name='newsdd-job-worker', daemon=True)
+        process.start()
+        return process
+
+    # Exit with the web server that started us, even if it could not stop us first
+    parent_pid = os.getppid()
+    queue = JobQueue(Config.JOB_QUEUE_PATH)
+    workers = [start() for _ in range(args.processes)]
+    print(f"✓ Started {args.processes} job worker(s)")
+    last_prune = 0.0
+    while not shutdown.is_set():
+        if os.getppid() != parent_pid:
+            print("⚠ Parent process exited; stopping job workers")
+            break
+        for i, process in enumerate(workers):
+            if not process.is_alive():
+                print(f"⚠ Job worker {process.pid} exited with code {process.exitcode}; restarting")
+                workers[i] = start()
+        if time.time() - last_prune > PRUNE_INTERVAL_S:
+            queue.prune()
+            last_prune = time.time()
+        shutdown.wait(1.0)
+
+    stop.set()
+    for process in workers:
+        process.join(timeout=60)
+        if process.is_alive():
+            process.terminate()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
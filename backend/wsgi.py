@@ -1,4 +1,7 @@
-from app import app
+"""
+WSGI entry point.
 
-if __name__ == "__main__":
-    app.run()
+Production: gunicorn -c gunicorn.conf.py wsgi:app
+Development: python app.py (also starts the background job workers)
+"""
+from app import app
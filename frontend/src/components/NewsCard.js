@@ -65,7 +65,7 @@ const NewsCard = ({ article, onClick, className = '' }) => {
               <span>{formatDate(article.publishedAt)}</span>
             </div>
             
-            {article.originalLanguage && article.originalLanguage !== 'en' && (
+            {article.originalLanguage && (article.translated_title || article.translatedDescription) && (
               <span className="bg-accent-50 dark:bg-accent-900/20 text-accent-600 dark:text-accent-400 px-2 py-1 rounded-full text-xs">
                 Translated
               </span>
@@ -154,7 +154,7 @@ const NewsModal = ({ article, isOpen, onClose, onStatsUpdate }) => {
               <span>{formatDate(article.publishedAt)}</span>
             </div>
             
-            {article.originalLanguage && article.originalLanguage !== 'en' && (
+            {article.originalLanguage && (article.translated_title || article.translatedDescription) && (
               <div className="flex items-center gap-2">
                 <Globe className="w-4 h-4" />
                 <span className="bg-accent-50 dark:bg-accent-900/20 text-accent-600 dark:text-accent-400 px-2 py-1 rounded-full text-xs">
@@ -33,6 +33,7 @@ const Dashboard = ({
 
       setNews(response.articles || []);
       setLastUpdated(new Date());
+      pollEnrichments(response.articles || [], preferences.language || 'en');
     } catch (err) {
       setError('Failed to fetch news. Please try again.');
       console.error('Error fetching news:', err);
@@ -41,6 +42,25 @@ const Dashboard = ({
     }
   };
 
+  // Summaries are produced in the background; fill them in as they complete
+  const pollEnrichments = async (articles, userLanguage) => {
+    let pending = articles.filter(a => a.summaryStatus === 'pending').map(a => a.id);
+    for (let attempt = 0; pending.length > 0 && attempt < 20; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 1500));
+      try {
+        const { enrichments } = await api.fetchEnrichments(pending, userLanguage);
+        setNews(current => current.map(article => {
+          const update = enrichments[article.id];
+          return update && update.summaryStatus !== 'pending' ? { ...article, ...update } : article;
+        }));
+        pending = pending.filter(id => enrichments[id] && enrichments[id].summaryStatus === 'pending');
+      } catch (err) {
+        console.error('Error fetching summaries:', err);
+        return;
+      }
+    }
+  };
+
   const handleRefresh = () => {
     fetchNews();
   };
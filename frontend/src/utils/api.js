@@ -44,6 +44,17 @@ const api = {
     return response.json();
   },
 
+  // Summaries/translations for articles returned with summaryStatus 'pending'
+  async fetchEnrichments(ids, userLanguage = 'en') {
+    const params = new URLSearchParams({ userLanguage });
+    ids.forEach(id => params.append('id', id));
+    const response = await fetch(`${API_BASE}/api/news/enrichments?${params}`, {
+      credentials: 'include'
+    });
+    if (!response.ok) throw new Error('Failed to fetch enrichments');
+    return response.json();
+  },
+
   async getArticle(articleId) {
     const response = await fetch(`${API_BASE}/api/article/${articleId}`, {
       credentials: 'include'